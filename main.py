@@ -11,6 +11,7 @@
 """
 
 import argparse
+import functools
 import sys
 import os
 from pathlib import Path
@@ -20,11 +21,49 @@ import json
 # 添加模块路径
 sys.path.append(str(Path(__file__).parent))
 
-from modules.utils import get_logger
-from modules.strategy import generate_content_strategy
-from modules.execution import execute_content_creation
-from modules.publisher import publish_content
-from modules.git_automation import get_git_automation, commit_checkpoint
+# 项目模块在参数解析完成后才导入，--help 和参数错误时无需加载
+# 重量级模块（Gemini SDK、Playwright等）仅在对应工作流中按需加载
+@functools.lru_cache(maxsize=1)
+def _get_strategy_generator():
+    """延迟加载策略生成函数"""
+    from modules.strategy import generate_content_strategy
+    return generate_content_strategy
+
+@functools.lru_cache(maxsize=1)
+def _get_content_executor():
+    """延迟加载内容创作函数"""
+    from modules.execution import execute_content_creation
+    return execute_content_creation
+
+@functools.lru_cache(maxsize=1)
+def _get_publisher():
+    """延迟加载发布函数"""
+    from modules.publisher import publish_content
+    return publish_content
+
+def _emit(*lines: str):
+    """将一组输出行合并为一次写入，并在段落结束时刷新"""
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
+
+def _validate_args(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """
+    在初始化配置和加载工作流模块之前校验参数组合，非法组合直接退出
+    
+    Args:
+        parser (argparse.ArgumentParser): 参数解析器，用于报告错误
+        args (argparse.Namespace): 解析后的参数
+    """
+    if args.git_checkpoint and args.git_message:
+        parser.error("--git-checkpoint 与 --git-message 不能同时使用")
+    
+    # 仅执行配置验证或手动Git操作时不需要主题
+    standalone_mode = args.validate_config or args.git_checkpoint or args.git_message
+    if not standalone_mode and not args.topic:
+        parser.error("生成内容需要指定 -t/--topic")
+    
+    if args.publish and (args.strategy_only or standalone_mode):
+        parser.error("--publish 需要配合生成内容的工作流使用")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -36,11 +75,12 @@ def main():
   python main.py -t "如何培养孩子的阅读兴趣" --strategy-only --verbose
   python main.py -t "宝宝夜哭不止怎么办" --publish --git-auto
   python main.py -t "测试主题" --config custom_config.yaml --verbose
+  python main.py --validate-config
         """
     )
     
-    # 必需参数
-    parser.add_argument('-t', '--topic', required=True, 
+    # 内容主题（生成类工作流必需，由_validate_args检查）
+    parser.add_argument('-t', '--topic',
                        help='内容主题')
     
     # 工作流选择
@@ -73,6 +113,11 @@ def main():
                        help='验证配置文件并退出')
     
     args = parser.parse_args()
+    _validate_args(parser, args)
+    
+    from modules.utils import get_logger
+    from modules.git_automation import get_git_automation, commit_checkpoint
+    
     logger = get_logger("main")
     
     try:
@@ -82,24 +127,29 @@ def main():
             from modules.core.exceptions import get_exception_handler
             
             # 初始化配置系统
-            config_file = args.config or "config.yaml"
-            config = initialize_config(config_file)
+            # 未指定--config时由配置系统选择默认配置文件
+            config = initialize_config(args.config)
             exception_handler = get_exception_handler()
             
             # 配置验证模式
             if args.validate_config:
-                print("✅ 配置文件验证成功")
-                print(f"📊 配置统计:")
-                print(f"  - 配置项总数: {len(config.get_all_config())}")
-                print(f"  - 引擎启用数: {sum(1 for k, v in config.get_all_config().items() if k.startswith('engines.') and k.endswith('.enabled') and v)}")
-                print(f"  - Git自动化: {'启用' if get_config_value('git.auto_commit', True) else '禁用'}")
+                all_config = config.get_all_config()
+                enabled_engines = sum(1 for k, v in all_config.items()
+                                      if k.startswith('engines.') and k.endswith('.enabled') and v)
+                _emit(
+                    "✅ 配置文件验证成功",
+                    "📊 配置统计:",
+                    f"  - 配置项总数: {len(all_config)}",
+                    f"  - 引擎启用数: {enabled_engines}",
+                    f"  - Git自动化: {'启用' if get_config_value('git.auto_commit', True) else '禁用'}",
+                )
                 return
             
             # 设置日志级别
             logger = get_logger()
             if args.verbose:
                 logger.info("🚀 小红书内容自动化生成系统 V2.0 启动...")
-                logger.info(f"📋 使用配置文件: {config_file}")
+                logger.info(f"📋 使用配置文件: {config.config_file}")
                 logger.info(f"🔧 核心组件已初始化")
                 
         except ImportError as e:
@@ -159,8 +209,7 @@ def main():
                 commit_checkpoint(f"准备发布 - {args.topic}")
             
             try:
-                from modules.publisher import publish_content
-                publish_result = publish_content(result)
+                publish_result = _get_publisher()(result)
                 if publish_result.get("success"):
                     logger.info("✅ 内容发布成功")
                     if args.git_auto and git_auto:
@@ -239,14 +288,14 @@ def run_traditional_workflow(args, logger, git_auto):
     try:
         # 1. 策略生成
         logger.info("📊 生成内容策略...")
-        strategy_result = generate_content_strategy(args.topic)
+        strategy_result = _get_strategy_generator()(args.topic)
         
         if git_auto:
             git_auto.auto_commit(f"生成内容策略 - {args.topic}", "feat")
         
         # 2. 内容创作
         logger.info("🎨 执行内容创作...")
-        creation_result = execute_content_creation(
+        creation_result = _get_content_executor()(
             topic=args.topic,
             strategy=strategy_result,
             force_regenerate=args.force_regenerate
@@ -271,7 +320,7 @@ def run_strategy_only(args, logger, git_auto):
     logger.info("🔄 仅生成内容策略")
     
     try:
-        strategy_result = generate_content_strategy(args.topic)
+        strategy_result = _get_strategy_generator()(args.topic)
         
         if git_auto:
             git_auto.auto_commit(f"生成内容策略 - {args.topic}", "feat")
@@ -11,13 +11,131 @@
 """
 
 import os
+import sys
 import json
+import marshal
+import warnings
 import yaml
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 from pathlib import Path
 from dataclasses import dataclass, field
 from enum import Enum
 
+# 优先使用libyaml的C实现，未编译libyaml时回退到纯Python实现
+try:
+    from yaml import CSafeLoader as YamlSafeLoader, CSafeDumper as YamlSafeDumper
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader, SafeDumper as YamlSafeDumper
+    warnings.warn("PyYAML未启用libyaml，配置文件将使用纯Python解析器", ImportWarning)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 环境变量覆盖配置项时使用的前缀
+ENV_PREFIX = "REDCUBE_"
+
+# 环境变量字符串按配置项当前值的类型转换，未列出的类型保持字符串
+_ENV_COERCERS = {
+    bool: lambda raw: raw.lower() in ('true', '1', 'yes', 'on'),
+    int: int,
+    float: float,
+    list: lambda raw: raw.split(','),
+}
+
+# 必需的配置项
+_REQUIRED_KEYS = ("system.name", "ai.model_name", "paths.cache_dir", "paths.output_dir")
+
+# 需要确保存在的目录配置项
+_PATH_KEYS = ("paths.cache_dir", "paths.output_dir", "paths.logs_dir")
+
+# 影响验证结果的配置项，只有它们变化时才需要重新验证
+_VALIDATED_KEYS = frozenset(_REQUIRED_KEYS + _PATH_KEYS)
+
+# 默认配置表（扁平化键 -> 默认值），实例化时整体导入
+_DEFAULTS: Dict[str, Any] = {
+    # 系统基础配置
+    "system.name": "ai_rednote_generate",
+    "system.version": "2.0.0",
+    "system.debug": False,
+    "system.log_level": "INFO",
+
+    # 目录配置
+    "paths.cache_dir": "cache",
+    "paths.output_dir": "output",
+    "paths.logs_dir": "logs",
+    "paths.templates_dir": "templates",
+
+    # AI模型配置
+    "ai.model_name": "gemini-pro",
+    "ai.temperature": 0.7,
+    "ai.max_tokens": 2048,
+    "ai.retry_attempts": 3,
+    "ai.timeout": 30,
+
+    # 工作流配置
+    "workflow.enable_cache": True,
+    "workflow.cache_ttl": 3600,
+    "workflow.parallel_engines": False,
+    "workflow.max_concurrent": 4,
+
+    # 引擎配置
+    "engines.persona_core.enabled": True,
+    "engines.strategy_compass.enabled": True,
+    "engines.truth_detector.enabled": True,
+    "engines.insight_distiller.enabled": True,
+    "engines.narrative_prism.enabled": True,
+    "engines.atomic_designer.enabled": True,
+    "engines.visual_encoder.enabled": True,
+    "engines.hifi_imager.enabled": True,
+
+    # Git自动化配置
+    "git.auto_commit": True,
+    "git.commit_on_engine_complete": True,
+    "git.commit_on_major_changes": True,
+    "git.commit_on_bug_fixes": True,
+    "git.max_files_per_commit": 20,
+
+    # 输出配置
+    "output.format": "auto",  # auto, json, text, hybrid
+    "output.quality": "high",
+    "output.compression": False,
+
+    # 错误处理配置
+    "error_handling.max_retries": 3,
+    "error_handling.retry_delay": 1.0,
+    "error_handling.fail_fast": False,
+    "error_handling.save_error_logs": True,
+
+    # 性能配置
+    "performance.enable_profiling": False,
+    "performance.memory_limit": "2GB",
+    "performance.execution_timeout": 300,
+
+    # 安全配置
+    "security.api_key_encryption": False,
+    "security.output_sanitization": True,
+    "security.rate_limiting": True,
+}
+
+def _env_key_for(key: str) -> str:
+    """配置键对应的环境变量名（如 ai.model_name -> REDCUBE_AI_MODEL_NAME）"""
+    return f"{ENV_PREFIX}{key.upper().replace('.', '_')}"
+
+def _build_section_index(keys) -> Dict[str, Dict[str, str]]:
+    """构建 顶层配置段 -> {段内键: 完整配置键} 索引"""
+    index: Dict[str, Dict[str, str]] = {}
+    for key in keys:
+        section, sep, sub_key = key.partition('.')
+        if sep:
+            index.setdefault(section, {})[sub_key] = key
+    return index
+
+# 默认配置的派生索引只在导入时计算一次，实例化时复制
+_DEFAULT_SECTION_INDEX = _build_section_index(_DEFAULTS)
+_DEFAULT_ENV_KEYS = {key: _env_key_for(key) for key in _DEFAULTS}
+
 class ConfigSource(Enum):
     """配置来源"""
     DEFAULT = "default"
@@ -25,7 +143,10 @@ class ConfigSource(Enum):
     ENV = "environment"
     OVERRIDE = "override"
 
-@dataclass
+# Python 3.10+ 的dataclass支持slots，配置项不再携带__dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_DATACLASS_SLOTS)
 class ConfigItem:
     """配置项"""
     key: str
@@ -38,11 +159,24 @@ class ConfigItem:
 class SystemConfig:
     """系统配置管理器"""
     
-    def __init__(self, config_file: Optional[str] = None):
-        self.config_file = config_file or "config.yaml"
-        self.config_data = {}
-        self.config_sources = {}
+    def __init__(self, config_file: Optional[str] = None, create_if_missing: bool = False):
+        self.config_file = self._resolve_config_file(config_file)
+        # 配置文件不存在时是否写出默认配置；需要落盘时也可显式调用export_config
+        self.create_if_missing = create_if_missing
+        # 按列存储配置：读取路径只访问值，来源和元信息分开存放
+        self.config_values: Dict[str, Any] = {}
+        self.config_sources: Dict[str, ConfigSource] = {}
+        self._config_meta: Dict[str, str] = {}  # 配置键 -> 描述，仅自省时使用
         self.validators = {}
+        # 配置键 -> 环境变量名，以及反向索引（下划线无法区分层级，同名时对应多个键）
+        self._env_keys: Dict[str, str] = {}
+        self._env_index: Dict[str, List[str]] = {}
+        # 顶层配置段 -> {段内键: 完整配置键}，get_section直接查表
+        self._section_index: Dict[str, Dict[str, str]] = {}
+        # 各来源的配置项数量，写入时增量维护
+        self._source_counts: Dict[ConfigSource, int] = dict.fromkeys(ConfigSource, 0)
+        # 验证相关配置项发生变化后置为True，验证通过后清除
+        self._needs_validation = True
         
         # 初始化默认配置
         self._init_default_config()
@@ -53,80 +187,73 @@ class SystemConfig:
         # 验证配置
         self.validate_config()
     
-    def _init_default_config(self):
-        """初始化默认配置"""
-        
-        # 系统基础配置
-        self.set_default("system.name", "ai_rednote_generate")
-        self.set_default("system.version", "2.0.0")
-        self.set_default("system.debug", False)
-        self.set_default("system.log_level", "INFO")
-        
-        # 目录配置
-        self.set_default("paths.cache_dir", "cache")
-        self.set_default("paths.output_dir", "output")
-        self.set_default("paths.logs_dir", "logs")
-        self.set_default("paths.templates_dir", "templates")
-        
-        # AI模型配置
-        self.set_default("ai.model_name", "gemini-pro")
-        self.set_default("ai.temperature", 0.7)
-        self.set_default("ai.max_tokens", 2048)
-        self.set_default("ai.retry_attempts", 3)
-        self.set_default("ai.timeout", 30)
-        
-        # 工作流配置
-        self.set_default("workflow.enable_cache", True)
-        self.set_default("workflow.cache_ttl", 3600)
-        self.set_default("workflow.parallel_engines", False)
-        self.set_default("workflow.max_concurrent", 4)
-        
-        # 引擎配置
-        self.set_default("engines.persona_core.enabled", True)
-        self.set_default("engines.strategy_compass.enabled", True)
-        self.set_default("engines.truth_detector.enabled", True)
-        self.set_default("engines.insight_distiller.enabled", True)
-        self.set_default("engines.narrative_prism.enabled", True)
-        self.set_default("engines.atomic_designer.enabled", True)
-        self.set_default("engines.visual_encoder.enabled", True)
-        self.set_default("engines.hifi_imager.enabled", True)
-        
-        # Git自动化配置
-        self.set_default("git.auto_commit", True)
-        self.set_default("git.commit_on_engine_complete", True)
-        self.set_default("git.commit_on_major_changes", True)
-        self.set_default("git.commit_on_bug_fixes", True)
-        self.set_default("git.max_files_per_commit", 20)
+    @staticmethod
+    def _resolve_config_file(config_file: Optional[str]) -> str:
+        """
+        解析实际使用的配置文件
         
-        # 输出配置
-        self.set_default("output.format", "auto")  # auto, json, text, hybrid
-        self.set_default("output.quality", "high")
-        self.set_default("output.compression", False)
+        显式指定的配置文件原样使用。未指定时，默认的config.yaml旁存在config.json则优先读取JSON（解析更快）；
+        两者都不存在时默认创建JSON配置。已有的YAML配置仍然可以正常读取。
+        """
+        if config_file:
+            return config_file
         
-        # 错误处理配置
-        self.set_default("error_handling.max_retries", 3)
-        self.set_default("error_handling.retry_delay", 1.0)
-        self.set_default("error_handling.fail_fast", False)
-        self.set_default("error_handling.save_error_logs", True)
+        config_path = Path("config.yaml")
+        json_path = config_path.with_suffix('.json')
+        if json_path.exists() or not config_path.exists():
+            return str(json_path)
+        return str(config_path)
+    
+    def _init_default_config(self):
+        """初始化默认配置（从_DEFAULTS表整体导入）"""
+        self.config_values.update(_DEFAULTS)
+        self.config_sources.update(dict.fromkeys(_DEFAULTS, ConfigSource.DEFAULT))
+        self._source_counts[ConfigSource.DEFAULT] += len(_DEFAULTS)
         
-        # 性能配置
-        self.set_default("performance.enable_profiling", False)
-        self.set_default("performance.memory_limit", "2GB")
-        self.set_default("performance.execution_timeout", 300)
+        for section, keys in _DEFAULT_SECTION_INDEX.items():
+            self._section_index.setdefault(section, {}).update(keys)
+        self._env_keys.update(_DEFAULT_ENV_KEYS)
+        for key, env_key in _DEFAULT_ENV_KEYS.items():
+            self._env_index.setdefault(env_key, []).append(key)
+    
+    @property
+    def config_data(self) -> Dict[str, ConfigItem]:
+        """按需组装的配置项快照（仅用于自省，修改快照不会影响配置）"""
+        return {
+            key: ConfigItem(
+                key=key,
+                value=value,
+                source=self.config_sources[key],
+                description=self._config_meta.get(key, "")
+            )
+            for key, value in self.config_values.items()
+        }
+    
+    def _store(self, key: str, value: Any, source: ConfigSource):
+        """写入配置值和来源，新配置键同时登记到配置段索引"""
+        previous_source = self.config_sources.get(key)
+        if key in _VALIDATED_KEYS and (previous_source is None or self.config_values[key] != value):
+            self._needs_validation = True
         
-        # 安全配置
-        self.set_default("security.api_key_encryption", False)
-        self.set_default("security.output_sanitization", True)
-        self.set_default("security.rate_limiting", True)
+        if previous_source is not None:
+            self._source_counts[previous_source] -= 1
+        else:
+            section, sep, sub_key = key.partition('.')
+            if sep:
+                self._section_index.setdefault(section, {})[sub_key] = key
+            # 登记时一次性生成环境变量名（如 ai.model_name -> REDCUBE_AI_MODEL_NAME）
+            env_key = _env_key_for(key)
+            self._env_keys[key] = env_key
+            self._env_index.setdefault(env_key, []).append(key)
+        self.config_values[key] = value
+        self.config_sources[key] = source
+        self._source_counts[source] += 1
     
     def set_default(self, key: str, value: Any, description: str = ""):
         """设置默认配置项"""
-        self.config_data[key] = ConfigItem(
-            key=key,
-            value=value,
-            source=ConfigSource.DEFAULT,
-            description=description
-        )
+        self._store(key, value, ConfigSource.DEFAULT)
+        if description:
+            self._config_meta[key] = description
     
     def load_config(self):
         """加载配置文件"""
@@ -144,58 +271,96 @@ class SystemConfig:
         """从配置文件加载"""
         config_path = Path(self.config_file)
         
-        if not config_path.exists():
-            # 创建默认配置文件
-            self._create_default_config_file()
+        try:
+            config_stat = config_path.stat()
+        except FileNotFoundError:
+            # 没有配置文件时直接使用默认配置，仅在明确要求时创建默认配置文件
+            if self.create_if_missing:
+                self._create_default_config_file()
             return
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                if config_path.suffix.lower() == '.yaml':
-                    file_config = yaml.safe_load(f)
-                elif config_path.suffix.lower() == '.json':
-                    file_config = json.load(f)
+            # 配置文件未变化时直接使用缓存的扁平化结果，跳过YAML/JSON解析
+            cache_path = self._get_flat_cache_path(config_path)
+            cache_key = (str(config_path.resolve()), config_stat.st_mtime_ns, config_stat.st_size)
+            flat_config = self._read_flat_cache(cache_path, cache_key)
+            
+            if flat_config is None:
+                suffix = config_path.suffix.lower()
+                if suffix == '.yaml':
+                    with open(config_path, 'r', encoding='utf-8') as f:
+                        file_config = yaml.load(f, Loader=YamlSafeLoader)
+                elif suffix == '.json':
+                    raw = config_path.read_bytes()
+                    file_config = orjson.loads(raw) if orjson is not None else json.loads(raw)
                 else:
                     raise ValueError(f"不支持的配置文件格式: {config_path.suffix}")
+                
+                # 扁平化配置并写入缓存
+                flat_config = self._flatten_dict(file_config)
+                self._write_flat_cache(cache_path, cache_key, flat_config)
             
-            # 扁平化配置并更新
-            flat_config = self._flatten_dict(file_config)
+            # 更新配置项
             for key, value in flat_config.items():
-                if key in self.config_data:
-                    self.config_data[key].value = value
-                    self.config_data[key].source = ConfigSource.FILE
-                else:
-                    self.config_data[key] = ConfigItem(
-                        key=key,
-                        value=value,
-                        source=ConfigSource.FILE
-                    )
+                self._store(key, value, ConfigSource.FILE)
                     
         except Exception as e:
             print(f"警告: 配置文件加载失败: {e}")
     
+    @staticmethod
+    def _get_flat_cache_path(config_path: Path) -> Path:
+        """获取扁平化配置缓存文件路径（与配置文件同目录）"""
+        return config_path.with_name(f"{config_path.name}.cache.marshal")
+    
+    @staticmethod
+    def _read_flat_cache(cache_path: Path, cache_key: tuple) -> Optional[Dict[str, Any]]:
+        """
+        读取扁平化配置缓存，缓存不存在、损坏或与配置文件不匹配时返回None
+        
+        使用marshal而不是pickle：marshal只还原基本数据类型，不会在加载时执行代码。
+        """
+        try:
+            with open(cache_path, 'rb') as f:
+                cached_key, flat_config = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        
+        if cached_key != cache_key or not isinstance(flat_config, dict):
+            return None
+        return flat_config
+    
+    @staticmethod
+    def _write_flat_cache(cache_path: Path, cache_key: tuple, flat_config: Dict[str, Any]):
+        """写入扁平化配置缓存，写入失败不影响配置加载"""
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                marshal.dump((cache_key, flat_config), f)
+            os.replace(tmp_path, cache_path)
+        except (OSError, ValueError):
+            # 含marshal不支持的类型（如YAML中的日期）时不写缓存
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    
     def _load_from_env(self):
         """从环境变量加载"""
-        env_prefix = "REDCUBE_"
+        # 只扫描一次环境变量，绝大多数配置项没有对应的环境变量
+        env_vars = [(env_key, env_value) for env_key, env_value in os.environ.items()
+                    if env_key.startswith(ENV_PREFIX)]
+        if not env_vars:
+            return
         
-        for key, config_item in self.config_data.items():
-            env_key = f"{env_prefix}{key.upper().replace('.', '_')}"
-            env_value = os.environ.get(env_key)
-            
-            if env_value is not None:
+        # 通过登记时维护的反向索引找到对应的配置键
+        for env_key, raw_value in env_vars:
+            for key in self._env_index.get(env_key, ()):
+                coerce = _ENV_COERCERS.get(type(self.config_values[key]))
+                
                 # 类型转换
                 try:
-                    if isinstance(config_item.value, bool):
-                        env_value = env_value.lower() in ('true', '1', 'yes', 'on')
-                    elif isinstance(config_item.value, int):
-                        env_value = int(env_value)
-                    elif isinstance(config_item.value, float):
-                        env_value = float(env_value)
-                    elif isinstance(config_item.value, list):
-                        env_value = env_value.split(',')
-                    
-                    config_item.value = env_value
-                    config_item.source = ConfigSource.ENV
+                    env_value = coerce(raw_value) if coerce is not None else raw_value
+                    self._store(key, env_value, ConfigSource.ENV)
                     
                 except ValueError as e:
                     print(f"警告: 环境变量 {env_key} 类型转换失败: {e}")
@@ -204,25 +369,41 @@ class SystemConfig:
         """创建默认配置文件"""
         config_dict = {}
         
-        for key, config_item in self.config_data.items():
-            self._set_nested_dict(config_dict, key, config_item.value)
+        for key, value in self.config_values.items():
+            self._set_nested_dict(config_dict, key, value)
         
         config_path = Path(self.config_file)
-        with open(config_path, 'w', encoding='utf-8') as f:
-            yaml.dump(config_dict, f, default_flow_style=False, allow_unicode=True)
+        if config_path.suffix.lower() == '.json':
+            self._write_json_config(config_path, config_dict)
+        else:
+            with open(config_path, 'w', encoding='utf-8') as f:
+                yaml.dump(config_dict, f, Dumper=YamlSafeDumper, default_flow_style=False, allow_unicode=True)
         
         print(f"创建默认配置文件: {config_path}")
     
+    @staticmethod
+    def _write_json_config(config_path: Path, config_dict: Dict[str, Any]):
+        """以2空格缩进写出JSON配置，安装了orjson时直接序列化为bytes"""
+        if orjson is not None:
+            config_path.write_bytes(orjson.dumps(config_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            config_path.write_text(json.dumps(config_dict, indent=2, ensure_ascii=False), encoding='utf-8')
+    
     def _flatten_dict(self, d: Dict[str, Any], parent_key: str = '', sep: str = '.') -> Dict[str, Any]:
-        """扁平化嵌套字典"""
-        items = []
-        for k, v in d.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(self._flatten_dict(v, new_key, sep=sep).items())
+        """扁平化嵌套字典（使用显式栈迭代，键顺序与递归展开一致）"""
+        result = {}
+        stack = [(parent_key, iter(d.items()))]
+        while stack:
+            prefix, items = stack[-1]
+            for k, v in items:
+                new_key = f"{prefix}{sep}{k}" if prefix else k
+                if isinstance(v, dict):
+                    stack.append((new_key, iter(v.items())))
+                    break
+                result[new_key] = v
             else:
-                items.append((new_key, v))
-        return dict(items)
+                stack.pop()
+        return result
     
     def _set_nested_dict(self, d: Dict[str, Any], key: str, value: Any):
         """设置嵌套字典的值"""
@@ -233,49 +414,40 @@ class SystemConfig:
     
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置值"""
-        config_item = self.config_data.get(key)
-        if config_item:
-            return config_item.value
-        return default
+        return self.config_values.get(key, default)
     
     def set(self, key: str, value: Any, source: ConfigSource = ConfigSource.OVERRIDE):
         """设置配置值"""
-        if key in self.config_data:
-            self.config_data[key].value = value
-            self.config_data[key].source = source
-        else:
-            self.config_data[key] = ConfigItem(
-                key=key,
-                value=value,
-                source=source
-            )
+        self._store(key, value, source)
     
     def get_section(self, section: str) -> Dict[str, Any]:
-        """获取配置段"""
-        result = {}
-        prefix = f"{section}."
+        """获取配置段（支持 engines 或 engines.persona_core 这样的多级段名）"""
+        top_section, sep, rest = section.partition('.')
+        keys = self._section_index.get(top_section, {})
+        values = self.config_values
         
-        for key, config_item in self.config_data.items():
-            if key.startswith(prefix):
-                sub_key = key[len(prefix):]
-                result[sub_key] = config_item.value
+        if not sep:
+            return {sub_key: values[key] for sub_key, key in keys.items()}
         
-        return result
+        prefix = f"{rest}."
+        return {
+            sub_key[len(prefix):]: values[key]
+            for sub_key, key in keys.items()
+            if sub_key.startswith(prefix)
+        }
+    
+    def _validate_if_needed(self):
+        """内部重新验证：验证相关配置项自上次验证通过后未变化时跳过"""
+        if self._needs_validation:
+            self.validate_config()
     
     def validate_config(self):
-        """验证配置"""
+        """验证配置（每次调用都完整检查环境变量并创建目录）"""
         errors = []
         
         # 检查必需的配置项
-        required_keys = [
-            "system.name",
-            "ai.model_name",
-            "paths.cache_dir",
-            "paths.output_dir"
-        ]
-        
-        for key in required_keys:
-            if key not in self.config_data or self.config_data[key].value is None:
+        for key in _REQUIRED_KEYS:
+            if self.config_values.get(key) is None:
                 errors.append(f"必需的配置项缺失: {key}")
         
         # 检查API密钥（测试模式下跳过）
@@ -285,58 +457,57 @@ class SystemConfig:
                 errors.append("缺少 GOOGLE_API_KEY 环境变量")
         
         # 检查目录是否存在
-        paths_to_check = ["paths.cache_dir", "paths.output_dir", "paths.logs_dir"]
-        for path_key in paths_to_check:
-            if path_key in self.config_data:
-                path_value = self.config_data[path_key].value
-                path_obj = Path(path_value)
-                if not path_obj.exists():
-                    path_obj.mkdir(parents=True, exist_ok=True)
+        for path_key in _PATH_KEYS:
+            if path_key in self.config_values:
+                # exist_ok本身是幂等的，不再额外exists()探测
+                os.makedirs(self.config_values[path_key], exist_ok=True)
         
         if errors:
             raise ValueError("配置验证失败:\n" + "\n".join(errors))
+        
+        self._needs_validation = False
     
     def reload_config(self):
         """重新加载配置"""
         self.load_config()
-        self.validate_config()
+        self._validate_if_needed()
     
     def get_config_info(self) -> Dict[str, Any]:
         """获取配置信息"""
         return {
-            "total_configs": len(self.config_data),
-            "sources": {
-                source.value: sum(1 for item in self.config_data.values() 
-                                 if item.source == source)
-                for source in ConfigSource
-            },
+            "total_configs": len(self.config_values),
+            "sources": {source.value: count for source, count in self._source_counts.items()},
             "config_file": self.config_file,
             "file_exists": Path(self.config_file).exists()
         }
     
     def get_all_config(self) -> Dict[str, Any]:
         """获取所有配置项"""
-        return {key: item.value for key, item in self.config_data.items()}
+        return dict(self.config_values)
     
     def export_config(self, output_file: str):
         """导出配置到文件"""
         config_dict = {}
         
-        for key, config_item in self.config_data.items():
-            self._set_nested_dict(config_dict, key, config_item.value)
+        for key, value in self.config_values.items():
+            self._set_nested_dict(config_dict, key, value)
         
         output_path = Path(output_file)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            if output_path.suffix.lower() == '.yaml':
-                yaml.dump(config_dict, f, default_flow_style=False, allow_unicode=True)
-            elif output_path.suffix.lower() == '.json':
-                json.dump(config_dict, f, indent=2, ensure_ascii=False)
-            else:
-                raise ValueError(f"不支持的输出格式: {output_path.suffix}")
+        suffix = output_path.suffix.lower()
+        if suffix == '.yaml':
+            with open(output_path, 'w', encoding='utf-8') as f:
+                yaml.dump(config_dict, f, Dumper=YamlSafeDumper, default_flow_style=False, allow_unicode=True)
+        elif suffix == '.json':
+            self._write_json_config(output_path, config_dict)
+        else:
+            raise ValueError(f"不支持的输出格式: {output_path.suffix}")
 
 # 全局配置实例
 _system_config = None
 
+# 已初始化的配置实例缓存：(配置文件绝对路径, 修改时间) -> SystemConfig
+_config_cache: Dict[tuple, SystemConfig] = {}
+
 def get_config() -> SystemConfig:
     """获取全局配置实例"""
     global _system_config
@@ -347,6 +518,7 @@ def get_config() -> SystemConfig:
 def reload_config():
     """重新加载全局配置"""
     global _system_config
+    _config_cache.clear()
     if _system_config:
         _system_config.reload_config()
 
@@ -359,15 +531,36 @@ def set_config_value(key: str, value: Any):
     """设置配置值的便捷函数"""
     get_config().set(key, value)
 
+def _config_cache_key(config_file: Optional[str]) -> tuple:
+    """生成配置实例缓存键，配置文件被修改后键随之变化"""
+    resolved = os.path.abspath(SystemConfig._resolve_config_file(config_file))
+    try:
+        mtime_ns = os.stat(resolved).st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
+    return resolved, mtime_ns
+
 def initialize_config(config_file: Optional[str] = None) -> SystemConfig:
-    """初始化配置系统的便捷函数"""
+    """
+    初始化配置系统的便捷函数
+    
+    同一进程内对未修改的同一配置文件重复初始化时，直接复用已验证的实例；
+    需要重新读取环境变量或强制重建时先调用reload_config()。
+    """
     global _system_config
+    cache_key = _config_cache_key(config_file)
+    cached = _config_cache.get(cache_key)
+    if cached is not None:
+        _system_config = cached
+        return cached
+    
     _system_config = SystemConfig(config_file)
+    # 配置文件可能在初始化时才被创建，按初始化后的状态登记
+    _config_cache[_config_cache_key(config_file)] = _system_config
     return _system_config
 
 def get_all_config() -> Dict[str, Any]:
     """获取所有配置项的便捷函数"""
-    config = get_config()
-    return {key: item.value for key, item in config.config_data.items()}
+    return get_config().get_all_config()
 
 # SystemConfig类的get_all_config方法通过实例方法提供 
\ No newline at end of file
@@ -13,8 +13,11 @@
 from typing import Dict, Any, Type, Callable, Optional, List, Set
 from abc import ABC, abstractmethod
 from enum import Enum
+import sys
 import inspect
-from functools import wraps
+import threading
+from collections import deque
+from functools import lru_cache, wraps
 
 class ServiceLifetime(Enum):
     """服务生命周期"""
@@ -22,9 +25,51 @@ class ServiceLifetime(Enum):
     TRANSIENT = "transient"  # 瞬时
     SCOPED = "scoped"       # 作用域
 
+@lru_cache(maxsize=None)
+def _cached_service_name(service_type: Type) -> str:
+    """计算并缓存服务名称，驻留字符串使字典查找可按身份快速比较"""
+    name = getattr(service_type, '__name__', None)
+    return sys.intern(name if name is not None else str(service_type))
+
+def _service_name(service_type: Type) -> str:
+    """获取服务名称（类型的__name__，没有时使用str()）"""
+    try:
+        return _cached_service_name(service_type)
+    except TypeError:
+        # 不可哈希的类型注解无法缓存
+        name = getattr(service_type, '__name__', None)
+        return sys.intern(name if name is not None else str(service_type))
+
+@lru_cache(maxsize=None)
+def _signature_params(cls: Type) -> tuple:
+    """
+    解析并缓存构造函数参数：((参数名, 类型注解, 默认值), ...)，不含self
+    
+    inspect.signature开销较大，同一个类只解析一次。
+    """
+    sig = inspect.signature(cls.__init__)
+    return tuple(
+        (name, param.annotation, param.default)
+        for name, param in sig.parameters.items()
+        if name != 'self'
+    )
+
+def _has_trivial_constructor(cls: Type) -> bool:
+    """类未自定义__init__和__new__，创建实例时不可能再回调容器"""
+    return (isinstance(cls, type)
+            and cls.__init__ is object.__init__
+            and cls.__new__ is object.__new__)
+
 class ServiceDescriptor:
     """服务描述符"""
     
+    # 解析服务时频繁读取描述符属性，使用槽位存储
+    __slots__ = (
+        'service_type', 'implementation', 'factory', 'instance', 'lifetime',
+        'dependencies', 'created_instance', 'name', 'constructor_params',
+        'builder', 'is_leaf', 'cleanup_method',
+    )
+    
     def __init__(self, 
                  service_type: Type,
                  implementation: Optional[Type] = None,
@@ -39,6 +84,17 @@ class ServiceDescriptor:
         self.lifetime = lifetime
         self.dependencies = dependencies or []
         self.created_instance = None
+        # 服务名称，注册时由容器写入（驻留字符串）
+        self.name: str = ""
+        # 构造函数参数，注册时预先解析（仅通过构造函数创建的服务需要）
+        self.constructor_params: Optional[tuple] = None
+        # 预编译的实例构建闭包，由容器在注册时生成
+        self.builder: Optional[Callable[[Any], Any]] = None
+        # 叶子服务：预设实例，或没有显式依赖且未自定义构造函数的类，创建时不会再解析其他服务
+        # （工厂函数和自定义构造函数可能在内部重新调用容器，始终不视为叶子）
+        self.is_leaf = False
+        # 清理容器时在作用域实例上调用的方法名
+        self.cleanup_method: Optional[str] = None
 
 class DependencyContainer:
     """依赖注入容器"""
@@ -48,6 +104,12 @@ class DependencyContainer:
         self.scoped_instances: Dict[str, Any] = {}
         self.dependency_graph: Dict[str, Set[str]] = {}
         self.creation_stack: List[str] = []
+        # 与creation_stack同步的集合，循环依赖检测为O(1)
+        self._creating: Set[str] = set()
+        # 已证明不在任何依赖环上的节点，注册时的循环依赖检查据此增量进行
+        self._acyclic_verified: Set[str] = set()
+        # 服务类型对象 -> 服务名称，按类型注解查找已注册服务时使用
+        self._services_by_type: Dict[type, str] = {}
     
     def register_singleton(self, service_type: Type, 
                           implementation: Optional[Type] = None,
@@ -87,7 +149,8 @@ class DependencyContainer:
                          lifetime: ServiceLifetime,
                          dependencies: Optional[List[str]]) -> 'DependencyContainer':
         """注册服务"""
-        service_name = self._get_service_name(service_type)
+        service_name = _service_name(service_type)
+        dependencies = [sys.intern(dep) for dep in dependencies or []]
         
         descriptor = ServiceDescriptor(
             service_type=service_type,
@@ -95,166 +158,199 @@ class DependencyContainer:
             factory=factory,
             instance=instance,
             lifetime=lifetime,
-            dependencies=dependencies or []
+            dependencies=dependencies
+        )
+        descriptor.name = service_name
+        
+        if factory is None and instance is None:
+            try:
+                descriptor.constructor_params = _signature_params(descriptor.implementation)
+            except (TypeError, ValueError):
+                pass  # 无法解析签名时在创建实例时再报错
+        descriptor.builder = self._compile_builder(descriptor)
+        descriptor.is_leaf = instance is not None or (
+            factory is None and not dependencies
+            and _has_trivial_constructor(descriptor.implementation)
         )
         
         self.services[service_name] = descriptor
+        if isinstance(service_type, type):
+            self._services_by_type[service_type] = service_name
+        
+        # 已验证的节点依赖关系发生变化时，之前的无环结论不再可靠
+        if service_name in self._acyclic_verified:
+            self._acyclic_verified.clear()
         
         # 更新依赖图
-        self.dependency_graph[service_name] = set(dependencies or [])
+        self.dependency_graph[service_name] = set(dependencies)
         
-        # 检查循环依赖
-        self._check_circular_dependencies()
+        # 检查循环依赖（只检查从新服务出发的依赖边）
+        self._check_circular_dependencies(service_name)
         
         return self
     
     def resolve(self, service_type: Type) -> Any:
         """解析服务"""
-        service_name = self._get_service_name(service_type)
-        return self._resolve_service(service_name)
+        return self._resolve_service(_service_name(service_type))
     
     def _resolve_service(self, service_name: str) -> Any:
         """解析服务实现"""
+        descriptor = self.services.get(service_name)
         
-        # 检查是否已在创建栈中（循环依赖检测）
-        if service_name in self.creation_stack:
-            raise RuntimeError(f"检测到循环依赖: {' -> '.join(self.creation_stack)} -> {service_name}")
+        # 快速路径：已创建的单例和作用域实例直接返回
+        if descriptor is not None:
+            if descriptor.lifetime is ServiceLifetime.SINGLETON:
+                if descriptor.instance is not None:
+                    return descriptor.instance
+                if descriptor.created_instance is not None:
+                    return descriptor.created_instance
+            elif descriptor.lifetime is ServiceLifetime.SCOPED:
+                if service_name in self.scoped_instances:
+                    return self.scoped_instances[service_name]
         
-        if service_name not in self.services:
+        if descriptor is None:
             raise ValueError(f"服务未注册: {service_name}")
         
-        descriptor = self.services[service_name]
-        
-        # 单例模式检查
-        if descriptor.lifetime == ServiceLifetime.SINGLETON:
-            if descriptor.instance is not None:
-                return descriptor.instance
-            if descriptor.created_instance is not None:
-                return descriptor.created_instance
+        # 叶子服务不会递归解析其他服务，不可能形成循环，无需检测和维护创建栈
+        if descriptor.is_leaf:
+            return self._store_instance(descriptor, descriptor.builder(self))
         
-        # 作用域模式检查
-        elif descriptor.lifetime == ServiceLifetime.SCOPED:
-            if service_name in self.scoped_instances:
-                return self.scoped_instances[service_name]
+        # 检查是否已在创建栈中（循环依赖检测）
+        if service_name in self._creating:
+            raise RuntimeError(f"检测到循环依赖: {' -> '.join(self.creation_stack)} -> {service_name}")
         
         # 创建实例
         self.creation_stack.append(service_name)
+        self._creating.add(service_name)
         try:
-            instance = self._create_instance(descriptor)
-            
-            # 保存实例
-            if descriptor.lifetime == ServiceLifetime.SINGLETON:
-                descriptor.created_instance = instance
-            elif descriptor.lifetime == ServiceLifetime.SCOPED:
-                self.scoped_instances[service_name] = instance
-            
-            return instance
-            
+            return self._store_instance(descriptor, descriptor.builder(self))
         finally:
             self.creation_stack.pop()
+            self._creating.discard(service_name)
+    
+    def _store_instance(self, descriptor: ServiceDescriptor, instance: Any) -> Any:
+        """按生命周期保存新创建的实例"""
+        if descriptor.lifetime == ServiceLifetime.SINGLETON:
+            descriptor.created_instance = instance
+        elif descriptor.lifetime == ServiceLifetime.SCOPED:
+            self.scoped_instances[descriptor.name] = instance
+        
+        return instance
     
-    def _create_instance(self, descriptor: ServiceDescriptor) -> Any:
-        """创建服务实例"""
+    @staticmethod
+    def _compile_builder(descriptor: ServiceDescriptor) -> Callable[['DependencyContainer'], Any]:
+        """
+        将服务描述符预编译为实例构建闭包
         
+        创建方式（预设实例、工厂方法、构造函数）和构造参数的解析计划在注册时确定，
+        解析服务时只需调用闭包。类型注解依赖仍在调用时解析，以支持后注册的服务。
+        """
         # 如果有预设实例
-        if descriptor.instance is not None:
-            return descriptor.instance
+        instance = descriptor.instance
+        if instance is not None:
+            return lambda container: instance
+        
+        dependencies = tuple(descriptor.dependencies)
         
         # 如果有工厂方法
-        if descriptor.factory is not None:
-            dependencies = self._resolve_dependencies(descriptor.dependencies)
-            return descriptor.factory(**dependencies)
+        factory = descriptor.factory
+        if factory is not None:
+            def build_from_factory(container: 'DependencyContainer') -> Any:
+                return factory(**{name: container._resolve_service(name) for name in dependencies})
+            return build_from_factory
         
         # 使用构造函数创建
-        return self._create_from_constructor(descriptor)
-    
-    def _create_from_constructor(self, descriptor: ServiceDescriptor) -> Any:
-        """从构造函数创建实例"""
         constructor = descriptor.implementation
+        params = descriptor.constructor_params
+        if params is None:
+            # 签名无法解析，调用时重新解析以抛出原始错误
+            return lambda container: _signature_params(constructor)
         
-        # 获取构造函数签名
-        sig = inspect.signature(constructor.__init__)
+        # 构造参数解析计划：(参数名, 是否显式依赖, 类型注解, 默认值)
+        dependency_names = set(dependencies)
+        empty = inspect.Parameter.empty
+        plan = tuple(
+            (name, name in dependency_names, annotation, default)
+            for name, annotation, default in params
+            if name in dependency_names or annotation is not empty
+        )
         
-        # 解析构造函数参数
-        args = {}
-        for param_name, param in sig.parameters.items():
-            if param_name == 'self':
-                continue
-            
-            # 尝试从依赖中解析
-            if param_name in descriptor.dependencies:
-                args[param_name] = self._resolve_service(param_name)
-            elif param.annotation != inspect.Parameter.empty:
+        def build_from_constructor(container: 'DependencyContainer') -> Any:
+            args = {}
+            for name, is_dependency, annotation, default in plan:
+                # 尝试从依赖中解析
+                if is_dependency:
+                    args[name] = container._resolve_service(name)
+                    continue
+                
                 # 尝试从类型注解解析
                 try:
-                    args[param_name] = self.resolve(param.annotation)
+                    args[name] = container.resolve(annotation)
                 except (ValueError, RuntimeError):
                     # 如果有默认值则使用默认值
-                    if param.default != inspect.Parameter.empty:
-                        args[param_name] = param.default
+                    if default is not empty:
+                        args[name] = default
                     else:
-                        raise ValueError(f"无法解析参数 {param_name} 的依赖")
+                        raise ValueError(f"无法解析参数 {name} 的依赖")
+            
+            return constructor(**args)
         
-        return constructor(**args)
+        return build_from_constructor
     
-    def _resolve_dependencies(self, dependencies: List[str]) -> Dict[str, Any]:
-        """解析依赖列表"""
-        resolved = {}
-        for dep_name in dependencies:
-            resolved[dep_name] = self._resolve_service(dep_name)
-        return resolved
-    
-    def _get_service_name(self, service_type: Type) -> str:
-        """获取服务名称"""
-        if hasattr(service_type, '__name__'):
-            return service_type.__name__
-        return str(service_type)
-    
-    def _check_circular_dependencies(self):
-        """检查循环依赖"""
+    def _check_circular_dependencies(self, service_name: str):
+        """
+        检查新注册的服务是否引入循环依赖
         
-        def dfs(node: str, visited: Set[str], path: Set[str]):
-            if node in path:
-                raise RuntimeError(f"检测到循环依赖: {node}")
-            
-            if node in visited:
-                return
-            
-            visited.add(node)
-            path.add(node)
-            
-            for dep in self.dependency_graph.get(node, []):
-                dfs(dep, visited, path)
-            
-            path.remove(node)
+        新增的依赖边都从service_name出发，因此只需从该节点做一次迭代DFS；
+        遇到已证明无环的节点直接跳过，检查通过后把本次访问的节点记入已验证集合。
+        """
+        verified = self._acyclic_verified
+        graph = self.dependency_graph
+        visited: Set[str] = set()
+        path: Set[str] = {service_name}
+        stack = [(service_name, iter(graph.get(service_name, ())))]
         
-        visited = set()
-        for service_name in self.dependency_graph:
-            if service_name not in visited:
-                dfs(service_name, visited, set())
+        while stack:
+            node, deps = stack[-1]
+            for dep in deps:
+                if dep in path:
+                    raise RuntimeError(f"检测到循环依赖: {dep}")
+                if dep in verified or dep in visited:
+                    continue
+                path.add(dep)
+                stack.append((dep, iter(graph.get(dep, ()))))
+                break
+            else:
+                stack.pop()
+                path.discard(node)
+                visited.add(node)
+        
+        verified.update(visited)
     
     def get_dependency_order(self) -> List[str]:
         """获取依赖顺序（拓扑排序）"""
+        graph = self.dependency_graph
+        # 只保留指向已注册服务的依赖边，排序循环中不再逐条判断
+        edges = {node: [dep for dep in deps if dep in graph] for node, deps in graph.items()}
+        
         # 计算入度
-        in_degree = {node: 0 for node in self.dependency_graph}
-        for node in self.dependency_graph:
-            for dep in self.dependency_graph[node]:
-                if dep in in_degree:
-                    in_degree[dep] += 1
+        in_degree = dict.fromkeys(graph, 0)
+        for deps in edges.values():
+            for dep in deps:
+                in_degree[dep] += 1
         
         # 拓扑排序
-        queue = [node for node, degree in in_degree.items() if degree == 0]
+        queue = deque(node for node, degree in in_degree.items() if degree == 0)
         result = []
         
         while queue:
-            node = queue.pop(0)
+            node = queue.popleft()
             result.append(node)
             
-            for dep in self.dependency_graph.get(node, []):
-                if dep in in_degree:
-                    in_degree[dep] -= 1
-                    if in_degree[dep] == 0:
-                        queue.append(dep)
+            for dep in edges[node]:
+                in_degree[dep] -= 1
+                if in_degree[dep] == 0:
+                    queue.append(dep)
         
         return result
     
@@ -264,13 +360,15 @@ class DependencyContainer:
     
     def get_service_info(self) -> Dict[str, Any]:
         """获取服务信息"""
+        services = self.services
+        # 一次遍历统计各生命周期的服务数量
+        lifetime_counts = dict.fromkeys(ServiceLifetime, 0)
+        for desc in services.values():
+            lifetime_counts[desc.lifetime] += 1
+        
         return {
-            "total_services": len(self.services),
-            "by_lifetime": {
-                lifetime.value: sum(1 for desc in self.services.values() 
-                                  if desc.lifetime == lifetime)
-                for lifetime in ServiceLifetime
-            },
+            "total_services": len(services),
+            "by_lifetime": {lifetime.value: count for lifetime, count in lifetime_counts.items()},
             "dependency_graph": {
                 name: list(deps) for name, deps in self.dependency_graph.items()
             },
@@ -279,21 +377,22 @@ class DependencyContainer:
                     "type": desc.service_type.__name__,
                     "implementation": desc.implementation.__name__,
                     "lifetime": desc.lifetime.value,
-                    "dependencies": desc.dependencies,
+                    "dependencies": list(desc.dependencies),
                     "has_instance": desc.created_instance is not None or desc.instance is not None
                 }
-                for name, desc in self.services.items()
+                for name, desc in services.items()
             }
         }
 
     def cleanup(self):
         """清理容器"""
         for service_name, config in self.services.items():
-            if config.get("cleanup_method"):
+            cleanup_method_name = config.cleanup_method
+            if cleanup_method_name:
                 instance = self.scoped_instances.get(service_name)
                 if instance:
                     try:
-                        cleanup_method = getattr(instance, config["cleanup_method"])
+                        cleanup_method = getattr(instance, cleanup_method_name)
                         cleanup_method()
                     except Exception as e:
                         print(f"清理服务 {service_name} 失败: {e}")
@@ -303,24 +402,19 @@ class DependencyContainer:
     
     def get_container_info(self) -> Dict[str, Any]:
         """获取容器信息"""
+        scoped_instances = self.scoped_instances
         return {
             "total_services": len(self.services),
-            "active_instances": len(self.scoped_instances),
-            "registered_services": list(self.services.keys()),
-            "dependency_graph": self._get_dependency_graph(),
+            "active_instances": len(scoped_instances),
+            "registered_services": list(self.services),
+            "dependency_graph": {
+                name: list(deps) for name, deps in self.dependency_graph.items()
+            },
             "lifecycle_status": {
-                service: "active" if service in self.scoped_instances else "registered"
-                for service in self.services.keys()
+                service: "active" if service in scoped_instances else "registered"
+                for service in self.services
             }
         }
-    
-    def _get_dependency_graph(self) -> Dict[str, List[str]]:
-        """获取依赖关系图"""
-        graph = {}
-        for service_name, config in self.services.items():
-            dependencies = config.dependencies
-            graph[service_name] = dependencies
-        return graph
 
 class EngineContainer(DependencyContainer):
     """引擎专用依赖容器"""
@@ -363,19 +457,25 @@ class EngineContainer(DependencyContainer):
         dependencies = []
         
         try:
-            sig = inspect.signature(engine_class.__init__)
-            for param_name, param in sig.parameters.items():
-                if param_name in ['self', 'llm']:
-                    continue
-                
-                # 如果参数类型是已注册的服务，则添加为依赖
-                if param.annotation != inspect.Parameter.empty:
-                    service_name = self._get_service_name(param.annotation)
-                    if service_name in self.services:
-                        dependencies.append(service_name)
+            params = _signature_params(engine_class)
+        except (TypeError, ValueError):
+            return dependencies  # 无法解析构造函数签名，返回空依赖列表
         
-        except Exception:
-            pass  # 自动检测失败，返回空依赖列表
+        for param_name, annotation, _ in params:
+            if param_name == 'llm':
+                continue
+            
+            # 如果参数类型是已注册的服务，则添加为依赖
+            if isinstance(annotation, type):
+                service_name = self._services_by_type.get(annotation)
+            elif isinstance(annotation, str):
+                # 字符串形式的注解（延迟求值）按服务名称匹配
+                service_name = annotation if annotation in self.services else None
+            else:
+                service_name = None
+            
+            if service_name is not None:
+                dependencies.append(service_name)
         
         return dependencies
     
@@ -385,13 +485,23 @@ class EngineContainer(DependencyContainer):
 
 # 全局容器实例
 _engine_container = None
+_engine_container_lock = threading.Lock()
 
 def get_engine_container() -> EngineContainer:
-    """获取全局引擎容器"""
+    """
+    获取全局引擎容器
+    
+    容器依赖配置和日志模块，不能在导入时创建；创建后的读取不加锁，
+    只有首次创建时通过双重检查加锁，避免多线程下重复创建。
+    """
     global _engine_container
-    if _engine_container is None:
-        _engine_container = EngineContainer()
-    return _engine_container
+    container = _engine_container
+    if container is None:
+        with _engine_container_lock:
+            container = _engine_container
+            if container is None:
+                container = _engine_container = EngineContainer()
+    return container
 
 def register_engine(engine_class: Type, dependencies: Optional[List[str]] = None):
     """注册引擎的便捷函数"""
@@ -11,11 +11,18 @@
 """
 
 from typing import Any, Dict, Optional, List, Union
-from enum import Enum
+from enum import Enum, IntEnum
+import sys
+import time
 import traceback
 import json
+import functools
+from collections import Counter, deque
 from datetime import datetime
 
+# 保留的最近错误日志条数，超出后丢弃最早的记录
+MAX_ERROR_LOGS = 1000
+
 class ErrorLevel(Enum):
     """错误级别"""
     INFO = "INFO"
@@ -23,8 +30,8 @@ class ErrorLevel(Enum):
     ERROR = "ERROR"
     CRITICAL = "CRITICAL"
 
-class ErrorCode(Enum):
-    """错误码"""
+class ErrorCode(IntEnum):
+    """错误码（IntEnum，成员本身即整数错误码）"""
     # 系统级错误 (1000-1999)
     SYSTEM_INIT_FAILED = 1001
     CONFIG_LOAD_FAILED = 1002
@@ -91,14 +98,39 @@ class BaseWorkflowException(Exception):
         self.level = level
         self.context = context or {}
         self.cause = cause
-        self.timestamp = datetime.now()
-        self.traceback_info = traceback.format_exc()
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
+        # 错误码的数值和名称在构造时取出一次，生成字典时不再访问枚举属性
+        self._error_code_value = error_code.value
+        self._error_name = error_code.name
+        # 构造时只记录时间戳和当前异常信息的引用，格式化推迟到首次读取
+        self._created_at = time.time()
+        self._exc_info = sys.exc_info()
+        self._traceback_info: Optional[str] = None
+    
+    @property
+    def timestamp(self) -> datetime:
+        """异常创建时间"""
+        return datetime.fromtimestamp(self._created_at)
+    
+    @property
+    def traceback_info(self) -> str:
+        """构造异常时正在处理的异常堆栈（与traceback.format_exc()一致），首次读取时格式化"""
+        if self._traceback_info is None:
+            self._traceback_info = "".join(traceback.format_exception(*self._exc_info))
+            self._exc_info = None
+        return self._traceback_info
+    
+    @traceback_info.setter
+    def traceback_info(self, value: str):
+        self._traceback_info = value
+        self._exc_info = None
+        self.__dict__.pop('_as_dict', None)
+    
+    @functools.cached_property
+    def _as_dict(self) -> Dict[str, Any]:
+        """字典格式（异常构造后不再变化，首次访问时生成并缓存，仅供内部只读使用）"""
         return {
-            "error_code": self.error_code.value,
-            "error_name": self.error_code.name,
+            "error_code": self._error_code_value,
+            "error_name": self._error_name,
             "level": self.level.value,
             "message": self.message,
             "context": self.context,
@@ -107,9 +139,13 @@ class BaseWorkflowException(Exception):
             "cause": str(self.cause) if self.cause else None
         }
     
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式（返回缓存字典的副本，调用方可自由修改）"""
+        return dict(self._as_dict)
+    
     def to_json(self) -> str:
         """转换为JSON格式"""
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+        return json.dumps(self._as_dict, ensure_ascii=False, indent=2)
 
 class SystemException(BaseWorkflowException):
     """系统级异常"""
@@ -174,7 +210,12 @@ class ExceptionHandler:
     
     def __init__(self):
         self.handlers = {}
-        self.error_logs = []
+        # 具体异常类型 -> 解析出的处理器（没有处理器时为None），注册处理器时清空
+        self._handler_cache: Dict[type, Any] = {}
+        self.error_logs: deque = deque(maxlen=MAX_ERROR_LOGS)
+        # 与error_logs同步维护的统计计数，统计时无需重新扫描日志
+        self._by_level: Counter = Counter()
+        self._by_error_code: Counter = Counter()
         self.recovery_strategies = {}
         
         # 注册默认处理器
@@ -201,6 +242,7 @@ class ExceptionHandler:
     def register_handler(self, exception_type: type, handler_func):
         """注册异常处理器"""
         self.handlers[exception_type] = handler_func
+        self._handler_cache.clear()
     
     def register_recovery_strategy(self, error_code: ErrorCode, strategy_func):
         """注册恢复策略"""
@@ -209,34 +251,62 @@ class ExceptionHandler:
     def handle_exception(self, exception: Exception) -> Dict[str, Any]:
         """处理异常"""
         
+        # 非工作流异常的堆栈信息只格式化一次，供日志和处理结果共用
+        traceback_info = None
+        if not isinstance(exception, BaseWorkflowException):
+            traceback_info = traceback.format_exc()
+        
         # 记录异常
-        self._log_exception(exception)
+        self._log_exception(exception, traceback_info)
         
         # 查找处理器
-        handler = None
-        for exc_type, handler_func in self.handlers.items():
-            if isinstance(exception, exc_type):
-                handler = handler_func
-                break
+        handler = self._resolve_handler(type(exception))
         
         if handler:
             return handler(exception)
         else:
-            return self._handle_unknown_exception(exception)
+            return self._handle_unknown_exception(exception, traceback_info)
+    
+    def _resolve_handler(self, exception_type: type):
+        """沿异常类型的MRO查找最近的已注册处理器，结果按具体类型缓存"""
+        try:
+            return self._handler_cache[exception_type]
+        except KeyError:
+            pass
+        
+        handler = None
+        for cls in exception_type.__mro__:
+            handler = self.handlers.get(cls)
+            if handler is not None:
+                break
+        
+        self._handler_cache[exception_type] = handler
+        return handler
     
-    def _log_exception(self, exception: Exception):
+    def _log_exception(self, exception: Exception, traceback_info: Optional[str] = None):
         """记录异常"""
         if isinstance(exception, BaseWorkflowException):
-            self.error_logs.append(exception.to_dict())
+            self._append_error_log(exception.to_dict())
         else:
-            self.error_logs.append({
+            self._append_error_log({
                 "error_code": ErrorCode.UNKNOWN_ERROR.value,
                 "level": ErrorLevel.ERROR.value,
                 "message": str(exception),
                 "timestamp": datetime.now().isoformat(),
-                "traceback": traceback.format_exc()
+                "traceback": traceback_info if traceback_info is not None else traceback.format_exc()
             })
     
+    def _append_error_log(self, entry: Dict[str, Any]):
+        """追加错误日志并更新统计计数，日志已满时同步扣除被挤出的记录"""
+        if len(self.error_logs) == self.error_logs.maxlen:
+            evicted = self.error_logs[0]
+            self._by_level[evicted.get("level", "UNKNOWN")] -= 1
+            self._by_error_code[evicted.get("error_code", "UNKNOWN")] -= 1
+        
+        self.error_logs.append(entry)
+        self._by_level[entry.get("level", "UNKNOWN")] += 1
+        self._by_error_code[entry.get("error_code", "UNKNOWN")] += 1
+    
     def _handle_system_exception(self, exception: SystemException) -> Dict[str, Any]:
         """处理系统异常"""
         return {
@@ -299,7 +369,8 @@ class ExceptionHandler:
             "should_retry": False
         }
     
-    def _handle_unknown_exception(self, exception: Exception) -> Dict[str, Any]:
+    def _handle_unknown_exception(self, exception: Exception,
+                                  traceback_info: Optional[str] = None) -> Dict[str, Any]:
         """处理未知异常"""
         return {
             "success": False,
@@ -308,7 +379,7 @@ class ExceptionHandler:
                 "level": ErrorLevel.ERROR.value,
                 "message": str(exception),
                 "timestamp": datetime.now().isoformat(),
-                "traceback": traceback.format_exc()
+                "traceback": traceback_info if traceback_info is not None else traceback.format_exc()
             },
             "recovery_action": "log_and_continue",
             "should_retry": False
@@ -319,25 +390,19 @@ class ExceptionHandler:
         if not self.error_logs:
             return {"total_errors": 0}
         
-        stats = {
+        recent_count = min(len(self.error_logs), 5)
+        return {
             "total_errors": len(self.error_logs),
-            "by_level": {},
-            "by_error_code": {},
-            "recent_errors": self.error_logs[-5:] if len(self.error_logs) > 5 else self.error_logs
+            "by_level": {level: count for level, count in self._by_level.items() if count},
+            "by_error_code": {code: count for code, count in self._by_error_code.items() if count},
+            "recent_errors": [self.error_logs[-i] for i in range(recent_count, 0, -1)]
         }
-        
-        for error in self.error_logs:
-            level = error.get("level", "UNKNOWN")
-            error_code = error.get("error_code", "UNKNOWN")
-            
-            stats["by_level"][level] = stats["by_level"].get(level, 0) + 1
-            stats["by_error_code"][error_code] = stats["by_error_code"].get(error_code, 0) + 1
-        
-        return stats
     
     def clear_error_logs(self):
         """清空错误日志"""
         self.error_logs.clear()
+        self._by_level.clear()
+        self._by_error_code.clear()
 
 # 全局异常处理器
 _exception_handler = ExceptionHandler()
@@ -0,0 +1,185 @@
+"""
+LLM调用结果缓存
+按调用内容（模型、参数、提示词输入）寻址，避免重复的相同调用
+
+功能特点：
+1. 内容寻址：缓存键为调用参数的SHA-256摘要
+2. 内存LRU缓存，可选磁盘持久化
+3. 过期时间（TTL）控制
+4. 命中/未命中统计
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# orjson为可选依赖，未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 默认缓存条目上限和过期时间（秒）
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL = 86400
+
+def make_cache_key(**parts: Any) -> str:
+    """
+    生成内容寻址的缓存键
+
+    参数按键名排序后序列化，相同内容的调用得到相同的键。
+
+    Args:
+        **parts: 影响调用结果的全部参数（模型名称、温度、提示词输入等）
+
+    Returns:
+        str: 十六进制SHA-256摘要
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class AsyncLRUCache:
+    """
+    异步LRU缓存（内存 + 可选磁盘）
+
+    接口为协程以便在引擎的异步流程中直接await；内存缓存的读写之间没有await点，
+    在同一事件循环中天然互斥，因此不需要额外加锁（也不会绑定到特定事件循环）。
+    内存中保存值的副本，读取时也返回副本，调用方修改结果不会影响后续命中。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        # 缓存键 -> (过期时间戳, 值)，按最近使用顺序排列
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "disk_hits": 0}
+        # 正在后台执行的磁盘写入（保留引用，避免任务被提前回收）
+        self._pending_writes = set()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        """缓存键对应的磁盘文件路径"""
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        """读取磁盘缓存，不存在或损坏时返回None"""
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                raw = f.read()
+            record = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            return record["expires_at"], record["value"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _serialize_record(expires_at: float, value: Any) -> bytes:
+        """将缓存记录序列化为字节，安装了orjson时使用orjson"""
+        record = {"expires_at": expires_at, "value": value}
+        if orjson is not None:
+            return orjson.dumps(record, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(record, ensure_ascii=False).encode('utf-8')
+
+    def _write_disk(self, key: str, payload: bytes):
+        """写入磁盘缓存（先写临时文件再替换），写入失败不影响内存缓存"""
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _store(self, key: str, expires_at: float, value: Any):
+        """写入内存缓存并淘汰最久未使用的条目（value由调用方保证不再被外部修改）"""
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """获取缓存值，未命中或已过期时返回None"""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return copy.deepcopy(entry[1])
+            del self._entries[key]
+
+        if self.disk_dir:
+            # 文件读取在线程池中执行，不阻塞事件循环
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None and entry[0] > now:
+                # 等待读取期间可能已有新值写入，此时保留内存中的新值
+                if key not in self._entries:
+                    self._store(key, *entry)
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                return copy.deepcopy(entry[1])
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float = DEFAULT_TTL):
+        """
+        写入缓存值
+
+        内存缓存立即更新；磁盘写入在线程池中后台执行，调用方无需等待文件I/O。
+        内存中保存value的副本，序列化也在当前协程中完成，之后调用方修改value不会影响缓存内容。
+        """
+        expires_at = time.time() + ttl
+        self._store(key, expires_at, copy.deepcopy(value))
+        if not self.disk_dir:
+            return
+
+        try:
+            payload = self._serialize_record(expires_at, value)
+        except (TypeError, ValueError):
+            # 无法序列化的值只保留在内存中
+            return
+        write = asyncio.get_running_loop().run_in_executor(None, self._write_disk, key, payload)
+        self._pending_writes.add(write)
+        write.add_done_callback(self._pending_writes.discard)
+
+    async def flush(self):
+        """等待所有后台磁盘写入完成"""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes)
+
+    async def clear(self):
+        """清空内存缓存（磁盘缓存保留）"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0
+        }
+
+# 全局LLM缓存实例
+_llm_cache = None
+
+def get_llm_cache() -> AsyncLRUCache:
+    """获取全局LLM缓存（磁盘缓存位于配置的缓存目录下）"""
+    global _llm_cache
+    if _llm_cache is None:
+        from modules.core.config import get_config_value
+        cache_dir = get_config_value("paths.cache_dir", "cache")
+        _llm_cache = AsyncLRUCache(disk_dir=os.path.join(cache_dir, "llm"))
+    return _llm_cache
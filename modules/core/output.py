@@ -11,14 +11,38 @@
 """
 
 import json
-from typing import Dict, Any, Optional, Union, List, Type
+import re
+from typing import Dict, Any, Optional, Union, List, Tuple, Type
 from enum import Enum
 from datetime import datetime
 from pathlib import Path
-import yaml
 from abc import ABC, abstractmethod
+import dataclasses
+import functools
 import os
 
+from modules.utils import ensure_dir
+
+# orjson和PyYAML在首次序列化时才导入，未使用YAML输出的运行不加载PyYAML
+@functools.lru_cache(maxsize=1)
+def _get_orjson():
+    """延迟导入orjson，未安装时返回None"""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+@functools.lru_cache(maxsize=1)
+def _get_yaml_dumper():
+    """延迟导入PyYAML，优先使用libyaml的C实现，未编译libyaml时回退到纯Python实现"""
+    import yaml
+    try:
+        from yaml import CDumper as YamlDumper
+    except ImportError:
+        from yaml import Dumper as YamlDumper
+    return yaml, YamlDumper
+
 class OutputFormat(Enum):
     """输出格式类型"""
     AUTO = "auto"        # 自动检测
@@ -38,6 +62,57 @@ class ContentType(Enum):
     DATA = "data"              # 数据集合
     CONFIGURATION = "config"    # 配置信息
 
+# 格式检测的多模式匹配：各组标记合并为一个正则，一次扫描即可判断是否命中任一标记
+# 标题和列表标记只在行首匹配，避免正文中的话题标签（#话题）、连字符和小数误判
+_MARKDOWN_INDICATOR_RE = re.compile(r'^[ \t]*(?:#{1,6}|[-*]|\d+\.)[ \t]|\*\*|`', re.MULTILINE)
+_STRUCTURED_INDICATOR_RE = re.compile(r'^#{2,4} |\*\*|^[ \t]*- |^[ \t]*\d+\. ', re.MULTILINE)
+
+def _json_default(obj: Any) -> Any:
+    """
+    序列化JSON默认不支持的类型：datetime转ISO字符串，枚举取值，dataclass转字典，
+    numpy数组及标量转Python原生值（orjson原生处理前三者和numpy，仅标准库回退时需要）
+    """
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if type(obj).__module__ == 'numpy' and hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps_bytes(obj: Any, indent: Optional[int] = 2) -> bytes:
+    """
+    序列化为UTF-8编码的JSON
+    
+    安装了orjson时使用orjson（仅支持2空格缩进或紧凑格式），否则回退到标准库json。
+    """
+    orjson = _get_orjson()
+    if orjson is not None and indent in (None, 0, 2):
+        # numpy数组、dataclass、datetime由orjson在C层直接序列化，不经过default回调
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=_json_default)
+    return json.dumps(obj, ensure_ascii=False, indent=indent, default=_json_default).encode('utf-8')
+
+def _dumps(obj: Any, indent: Optional[int] = 2) -> str:
+    """序列化为JSON字符串"""
+    return _dumps_bytes(obj, indent).decode('utf-8')
+
+def _write_bytes(path: str, data: bytes):
+    """一次写入整个文件"""
+    with open(path, 'wb') as f:
+        f.write(data)
+
+def _loads(raw: Union[str, bytes]) -> Any:
+    """解析JSON，安装了orjson时使用orjson"""
+    orjson = _get_orjson()
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
 class OutputValidator(ABC):
     """输出验证器抽象类"""
     
@@ -68,8 +143,7 @@ class TextValidator(OutputValidator):
             self.error_msg = "内容不能为空"
             return False
         
-        content_str = str(content)
-        content_length = len(content_str)
+        content_length = len(content if isinstance(content, str) else str(content))
         
         if content_length < self.min_length:
             self.error_msg = f"内容长度不能少于{self.min_length}个字符，当前{content_length}个字符"
@@ -102,9 +176,9 @@ class JSONValidator(OutputValidator):
                 self.error_message = f"缺少必需字段: {field}"
                 return False
         
-        # 检查JSON序列化能力
+        # 检查JSON序列化能力（与保存时使用同一序列化路径）
         try:
-            json.dumps(content, ensure_ascii=False)
+            _dumps_bytes(content, None)
         except (TypeError, ValueError) as e:
             self.error_message = f"内容无法序列化为JSON: {str(e)}"
             return False
@@ -121,6 +195,11 @@ class UnifiedOutput:
                  engine_name: str,
                  topic: str,
                  content_type: ContentType = ContentType.REPORT):
+        # to_dict()结果缓存，通过set_*等方法或属性赋值修改输出时失效
+        self._dict_cache: Optional[Dict[str, Any]] = None
+        # 内容的文本形式及长度：(内容对象, 文本, 长度)，按内容对象身份复用
+        self._content_meta: Optional[Tuple[Any, str, int]] = None
+        
         self.engine_name = engine_name
         self.topic = topic
         self.content_type = content_type
@@ -130,10 +209,59 @@ class UnifiedOutput:
         self.structured_data = {}
         self.validators = []
         self.created_at = datetime.now()
+        self._created_at_iso = self.created_at.isoformat()
         
         # 根据内容类型设置默认验证器
         self._setup_default_validators()
     
+    @property
+    def content_type(self) -> ContentType:
+        return self._content_type
+    
+    @content_type.setter
+    def content_type(self, value: ContentType):
+        # 枚举值在设置时取出一次，序列化和摘要直接使用
+        self._content_type = value
+        self._content_type_value = value.value
+        self._invalidate_caches()
+    
+    @property
+    def format(self) -> OutputFormat:
+        return self._format
+    
+    @format.setter
+    def format(self, value: OutputFormat):
+        self._format = value
+        self._format_value = value.value
+        self._invalidate_caches()
+    
+    @property
+    def content(self) -> Any:
+        return self._content
+    
+    @content.setter
+    def content(self, value: Any):
+        self._content = value
+        self._invalidate_caches()
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._metadata
+    
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]):
+        self._metadata = value
+        self._invalidate_caches()
+    
+    @property
+    def structured_data(self) -> Dict[str, Any]:
+        return self._structured_data
+    
+    @structured_data.setter
+    def structured_data(self, value: Dict[str, Any]):
+        self._structured_data = value
+        self._invalidate_caches()
+    
     def _setup_default_validators(self):
         """设置默认验证器"""
         if self.content_type in [ContentType.REPORT, ContentType.ANALYSIS]:
@@ -141,6 +269,30 @@ class UnifiedOutput:
         elif self.content_type in [ContentType.DATA, ContentType.CONFIGURATION]:
             self.validators.append(JSONValidator())
     
+    def _invalidate_caches(self):
+        """输出内容变化后清除序列化和内容文本缓存"""
+        self._dict_cache = None
+        self._content_meta = None
+    
+    def _content_metrics(self) -> Tuple[Optional[str], int]:
+        """
+        内容的文本形式和长度；无内容时返回(None, 0)
+        
+        字符串内容不可变，同一内容只计算一次；字典等可变内容可能被原地修改，每次重新转换。
+        """
+        content = self.content
+        if not content:
+            return None, 0
+        
+        if not isinstance(content, str):
+            text = str(content)
+            return text, len(text)
+        
+        meta = self._content_meta
+        if meta is None or meta[0] is not content:
+            meta = self._content_meta = (content, content, len(content))
+        return meta[1], meta[2]
+    
     def set_content(self, content: Any, format_type: OutputFormat = OutputFormat.AUTO) -> 'UnifiedOutput':
         """设置内容"""
         self.content = content
@@ -154,16 +306,19 @@ class UnifiedOutput:
     
     def set_metadata(self, **kwargs) -> 'UnifiedOutput':
         """设置元数据"""
+        self._invalidate_caches()
         self.metadata.update(kwargs)
         return self
     
     def set_structured_data(self, data: Dict[str, Any]) -> 'UnifiedOutput':
         """设置结构化数据"""
+        self._invalidate_caches()
         self.structured_data.update(data)
         return self
     
     def add_validator(self, validator: OutputValidator) -> 'UnifiedOutput':
         """添加验证器"""
+        self._invalidate_caches()
         self.validators.append(validator)
         return self
     
@@ -175,11 +330,7 @@ class UnifiedOutput:
             if self._is_markdown(content):
                 return OutputFormat.MARKDOWN
             
-            # 检查是否是结构化文本报告
-            if self._is_structured_text(content):
-                return OutputFormat.TEXT
-            
-            # 默认为文本
+            # 结构化文本报告和普通文本都按文本处理，无需再扫描结构化标记
             return OutputFormat.TEXT
         
         elif isinstance(content, (dict, list)):
@@ -191,13 +342,11 @@ class UnifiedOutput:
     
     def _is_markdown(self, content: str) -> bool:
         """检查是否是Markdown格式"""
-        markdown_indicators = ['#', '##', '###', '**', '*', '`', '```', '-', '1.']
-        return any(indicator in content for indicator in markdown_indicators)
+        return _MARKDOWN_INDICATOR_RE.search(content) is not None
     
     def _is_structured_text(self, content: str) -> bool:
         """检查是否是结构化文本"""
-        structured_indicators = ['## ', '### ', '#### ', '**', '- ', '1. ', '2. ']
-        return any(indicator in content for indicator in structured_indicators)
+        return _STRUCTURED_INDICATOR_RE.search(content) is not None
     
     def validate(self) -> bool:
         """验证内容"""
@@ -207,13 +356,21 @@ class UnifiedOutput:
         return True
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
+        """
+        转换为字典格式
+        
+        顶层字典会被缓存，通过set_*方法或属性赋值修改后重新生成；
+        每次返回浅拷贝，调用方修改返回结果不会影响后续调用。
+        """
+        if self._dict_cache is not None:
+            return dict(self._dict_cache)
+        
         result = {
             "engine": self.engine_name,
             "topic": self.topic,
-            "content_type": self.content_type.value,
-            "format": self.format.value,
-            "created_at": self.created_at.isoformat(),
+            "content_type": self._content_type_value,
+            "format": self._format_value,
+            "created_at": self._created_at_iso,
             "metadata": self.metadata
         }
         
@@ -226,59 +383,63 @@ class UnifiedOutput:
             result["content"] = self.content
             result["structured_data"] = self.structured_data
         
-        return result
+        self._dict_cache = result
+        return dict(result)
     
     def to_json(self, indent: int = 2) -> str:
         """转换为JSON字符串"""
-        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+        return _dumps(self.to_dict(), indent)
     
     def to_yaml(self) -> str:
         """转换为YAML字符串"""
-        return yaml.dump(self.to_dict(), default_flow_style=False, allow_unicode=True)
+        yaml, YamlDumper = _get_yaml_dumper()
+        return yaml.dump(self.to_dict(), Dumper=YamlDumper, default_flow_style=False,
+                         allow_unicode=True)
     
     def save_to_file(self, base_path: Union[str, Path], create_dirs: bool = True):
         """保存到文件"""
-        base_path = Path(base_path)
-        
         if create_dirs:
-            base_path.mkdir(parents=True, exist_ok=True)
+            os.makedirs(base_path, exist_ok=True)
+        
+        # 文件名前缀只拼接一次，各文件路径直接使用字符串
+        prefix = os.path.join(os.fspath(base_path), self.engine_name)
+        result_file = prefix + ".json"
+        files = {
+            "content_file": None,
+            "data_file": None,
+            "metadata_file": None,
+            "result_file": result_file
+        }
         
         # 保存主要内容
         if self.format in [OutputFormat.TEXT, OutputFormat.MARKDOWN]:
-            content_file = base_path / f"{self.engine_name}_content.txt"
+            content_file = prefix + "_content.txt"
             with open(content_file, 'w', encoding='utf-8') as f:
-                f.write(str(self.content))
+                f.write(self._content_metrics()[0] or str(self.content))
+            files["content_file"] = content_file
         
         # 保存结构化数据
         if self.structured_data:
-            data_file = base_path / f"{self.engine_name}_data.json"
-            with open(data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.structured_data, f, ensure_ascii=False, indent=2)
+            data_file = prefix + "_data.json"
+            _write_bytes(data_file, _dumps_bytes(self.structured_data, 2))
+            files["data_file"] = data_file
         
         # 保存元数据
-        metadata_file = base_path / f"{self.engine_name}_metadata.json"
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, ensure_ascii=False, indent=2)
+        metadata_file = prefix + "_metadata.json"
+        _write_bytes(metadata_file, _dumps_bytes(self.metadata, 2))
+        files["metadata_file"] = metadata_file
         
         # 保存完整结果
-        result_file = base_path / f"{self.engine_name}.json"
-        with open(result_file, 'w', encoding='utf-8') as f:
-            f.write(self.to_json())
+        _write_bytes(result_file, _dumps_bytes(self.to_dict(), 2))
         
-        return {
-            "content_file": str(content_file) if self.format in [OutputFormat.TEXT, OutputFormat.MARKDOWN] else None,
-            "data_file": str(data_file) if self.structured_data else None,
-            "metadata_file": str(metadata_file),
-            "result_file": str(result_file)
-        }
+        return files
     
     @classmethod
     def load_from_file(cls, result_file: Union[str, Path]) -> 'UnifiedOutput':
         """从文件加载"""
         result_file = Path(result_file)
         
-        with open(result_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = _loads(result_file.read_bytes())
         
         # 创建实例
         output = cls(
@@ -303,27 +464,30 @@ class UnifiedOutput:
         return output
     
     def get_summary(self) -> Dict[str, Any]:
-        """获取内容摘要"""
+        """获取内容摘要（每次生成新的字典，字符串内容的文本长度复用缓存）"""
+        content = self.content
+        content_str, content_length = self._content_metrics()
+        
         summary = {
             "engine": self.engine_name,
             "topic": self.topic,
-            "content_type": self.content_type.value,
-            "format": self.format.value,
-            "created_at": self.created_at.isoformat(),
+            "content_type": self._content_type_value,
+            "format": self._format_value,
+            "created_at": self._created_at_iso,
             "has_content": self.content is not None,
-            "content_length": len(str(self.content)) if self.content else 0,
+            "content_length": content_length,
             "metadata_keys": list(self.metadata.keys()),
             "structured_data_keys": list(self.structured_data.keys())
         }
         
         # 添加内容预览
-        if self.content:
-            if isinstance(self.content, str):
-                summary["content_preview"] = str(self.content)[:200] + "..." if len(str(self.content)) > 200 else str(self.content)
-            elif isinstance(self.content, dict):
-                summary["content_preview"] = f"字典包含{len(self.content)}个键"
+        if content:
+            if isinstance(content, str):
+                summary["content_preview"] = content_str[:200] + "..." if content_length > 200 else content_str
+            elif isinstance(content, dict):
+                summary["content_preview"] = f"字典包含{len(content)}个键"
             else:
-                summary["content_preview"] = str(type(self.content))
+                summary["content_preview"] = str(type(content))
         
         return summary
 
@@ -332,7 +496,8 @@ class OutputManager:
     
     def __init__(self, base_output_dir: str = "output"):
         self.base_output_dir = Path(base_output_dir)
-        self.outputs: Dict[str, UnifiedOutput] = {}
+        # (引擎名称, 主题) -> 输出对象，导出摘要时才拼接为字符串键
+        self.outputs: Dict[Tuple[str, str], UnifiedOutput] = {}
         
         # 确保输出目录存在
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
@@ -341,7 +506,7 @@ class OutputManager:
                      content_type: ContentType = ContentType.REPORT) -> UnifiedOutput:
         """创建输出对象"""
         output = UnifiedOutput(engine_name, topic, content_type)
-        self.outputs[f"{engine_name}_{topic}"] = output
+        self.outputs[(engine_name, topic)] = output
         return output
     
     def save_output(self, output: UnifiedOutput, subdirectory: Optional[str] = None):
@@ -351,7 +516,8 @@ class OutputManager:
             save_dir = save_dir / subdirectory
         
         engine_dir = save_dir / f"engine_{output.engine_name}"
-        return output.save_to_file(engine_dir)
+        ensure_dir(engine_dir)
+        return output.save_to_file(engine_dir, create_dirs=False)
     
     def load_output(self, engine_name: str, topic: str, subdirectory: Optional[str] = None) -> Optional[UnifiedOutput]:
         """加载输出"""
@@ -370,7 +536,10 @@ class OutputManager:
         """获取输出摘要"""
         return {
             "total_outputs": len(self.outputs),
-            "outputs": {key: output.get_summary() for key, output in self.outputs.items()},
+            "outputs": {
+                f"{engine_name}_{topic}": output.get_summary()
+                for (engine_name, topic), output in self.outputs.items()
+            },
             "base_directory": str(self.base_output_dir)
         }
 
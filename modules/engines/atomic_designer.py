@@ -21,175 +21,202 @@ RedCube AI 工作流系统
 - 输出可直接执行的施工图
 """
 
+import asyncio
 import json
+import logging
 import os
+import re
 import sys
 from typing import Dict, Any, Optional, List
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema.output_parser import StrOutputParser
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import Generation
 from langchain_core.runnables import RunnablePassthrough
 
+# orjson为可选依赖，未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# fastjsonschema为可选依赖，未安装时跳过设计结构校验
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
 # 修复导入路径问题
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from modules.langchain_workflow import BaseWorkflowEngine
+from modules.core.output import ContentType, OutputFormat
+from modules.core.llm_cache import get_llm_cache, make_cache_key
 from modules.utils import get_logger
 
-class AtomicDesignerEngine(BaseWorkflowEngine):
-    """原子设计师引擎 - 页面布局设计"""
-    
-    def __init__(self, llm):
-        super().__init__("atomic_designer", llm)
-        self._initialize_design_chain()
-    
-    def _initialize_design_chain(self):
-        """初始化原子设计链"""
-        
-        system_prompt = """
-你是RedCube AI的"原子设计师大师"，专门负责将叙事架构转化为精确的页面设计施工图。
-
-## 核心使命：精确的页面级设计规范
-
-为每一篇笔记生成细化到"逐页"的、包含文案和视觉构思的"施工图"，确保最终视觉效果的精确控制。
-
-## 原子设计原理
-
-### 【设计大纲的技术核心】
-"设计大纲"的技术核心：精确、可执行的技术性指令
-
-你输出的不是模糊描述，而是AI可以100%理解并执行的"代码"级别的设计指令：
-
-#### 信息图: 3/9
-- **页面类型**: 核心要点对比
-- **页面标题**: 两种技术路线的优劣
-- **核心内容与视觉构思**:
-  - **布局**: 上下对比结构
-  - **上半部分**:
-    - **构思**: 淡蓝背景卡片(`bg-blue-100`)
-    - **标题**: "路线A" + 图标 "⚙️"
-  - **下半部分**:
-    - **构思**: 淡绿背景卡片(`bg-green-100`)
-    - **标题**: "路线B" + 图标 "🚀"
-
-这不是模糊描述，而是AI可以100%理解并执行的"代码"。
-
-### 【页面设计规范】
-1. **技术指向性**
-   - 具体的CSS类名和颜色代码
-   - 明确的布局结构和元素位置
-   - 精确的图标和视觉元素选择
-
-2. **完整性保证**
-   - 每页都有完整的设计方案
-   - 文案与视觉的精确匹配
-   - 从标题到细节的全面覆盖
-
-3. **一致性维护**
-   - 整体风格的统一协调
-   - 品牌色彩的一致应用
-   - 设计语言的连贯表达
+# ===================================
+# 原子设计提示词
+# ===================================
 
-### 【输出规范】
-必须返回严格的JSON格式：
+# 模型输出首尾的Markdown代码块标记（```json ... ```），一次替换去除
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
 
-```json
-{{
-  "publication_package": {{
+# JSON输出示例（源码中保持可读格式，导入时压缩后嵌入系统提示词）
+_DESIGN_OUTPUT_EXAMPLE = """
+{
+  "publication_package": {
     "xiaohongshu_titles": [
       "主标题选项1（高点击率导向）",
       "主标题选项2（价值导向）",
       "主标题选项3（话题导向）"
     ],
-    "xiaohongshu_content": {{
+    "xiaohongshu_content": {
       "main_text": "小红书正文内容",
       "hashtags": ["#标签1", "#标签2", "#标签3"],
       "call_to_action": "行动引导文案"
-    }},
-    "content_metadata": {{
+    },
+    "content_metadata": {
       "target_audience": "目标受众",
       "content_category": "内容分类",
       "publishing_timing": "发布时机建议"
-    }}
-  }},
+    }
+  },
   "page_design_specs": [
-    {{
+    {
       "page_number": 1,
       "page_type": "封面页/内容页/对比页/结尾页",
       "page_title": "具体页面标题",
-      "layout_structure": {{
+      "layout_structure": {
         "layout_type": "布局类型（单栏/双栏/上下分割/左右分割）",
         "main_sections": [
-          {{
+          {
             "section_name": "区域名称",
             "section_purpose": "区域功能",
             "content_elements": ["元素1", "元素2"],
             "visual_treatment": "视觉处理方式"
-          }}
+          }
         ]
-      }},
-      "content_specification": {{
+      },
+      "content_specification": {
         "headline": "页面主标题",
         "subheadline": "副标题（如有）",
         "body_content": [
-          {{
+          {
             "content_type": "文本/列表/引用/数据",
             "content_text": "具体文字内容",
             "visual_emphasis": "视觉强调方式",
             "formatting": "格式化要求"
-          }}
+          }
         ],
         "supporting_elements": ["支撑元素1", "支撑元素2"]
-      }},
-      "visual_design": {{
-        "color_scheme": {{
+      },
+      "visual_design": {
+        "color_scheme": {
           "primary_color": "主色调（CSS代码）",
           "secondary_color": "辅助色（CSS代码）",
           "background_color": "背景色（CSS代码）",
           "text_color": "文字色（CSS代码）"
-        }},
-        "typography": {{
+        },
+        "typography": {
           "title_font": "标题字体设置",
           "body_font": "正文字体设置",
           "emphasis_treatment": "强调文字处理"
-        }},
+        },
         "visual_elements": [
-          {{
+          {
             "element_type": "图标/插图/图表/装饰",
             "element_description": "元素具体描述",
             "placement": "放置位置",
             "size_specification": "尺寸规格",
             "style_treatment": "样式处理"
-          }}
+          }
         ]
-      }},
-      "technical_implementation": {{
+      },
+      "technical_implementation": {
         "css_classes": ["css-class-1", "css-class-2"],
         "layout_code": "布局代码指导",
         "responsive_notes": "响应式设计说明",
         "accessibility_considerations": "无障碍访问考虑"
-      }}
-    }}
+      }
+    }
   ],
-  "design_system": {{
-    "brand_guidelines": {{
+  "design_system": {
+    "brand_guidelines": {
       "color_palette": ["#颜色1", "#颜色2", "#颜色3"],
       "typography_scale": "字体层级系统",
       "spacing_system": "间距系统",
       "component_library": ["组件1", "组件2"]
-    }},
-    "visual_consistency": {{
+    },
+    "visual_consistency": {
       "design_principles": ["原则1", "原则2"],
       "style_guidelines": "风格指导原则",
       "quality_standards": "质量标准"
-    }}
-  }},
-  "production_notes": {{
+    }
+  },
+  "production_notes": {
     "design_priorities": ["优先级1", "优先级2"],
     "implementation_sequence": "实施顺序",
     "quality_checkpoints": ["检查点1", "检查点2"],
     "revision_guidelines": "修改指导原则"
-  }}
-}}
+  }
+}
+"""
+
+def _compact_output_example(example: str) -> str:
+    """去除示例JSON中的空白以减少输入token，并转义花括号避免被当作模板变量"""
+    compact = json.dumps(json.loads(example), separators=(",", ":"), ensure_ascii=False)
+    return compact.replace("{", "{{").replace("}", "}}")
+
+# 系统提示词（含完整JSON输出规范）是静态内容，模块级定义，所有调用共享同一前缀
+DESIGN_SYSTEM_PROMPT = """
+你是RedCube AI的"原子设计师大师"，专门负责将叙事架构转化为精确的页面设计施工图。
+
+## 核心使命：精确的页面级设计规范
+
+为每一篇笔记生成细化到"逐页"的、包含文案和视觉构思的"施工图"，确保最终视觉效果的精确控制。
+
+## 原子设计原理
+
+### 【设计大纲的技术核心】
+"设计大纲"的技术核心：精确、可执行的技术性指令
+
+你输出的不是模糊描述，而是AI可以100%理解并执行的"代码"级别的设计指令：
+
+#### 信息图: 3/9
+- **页面类型**: 核心要点对比
+- **页面标题**: 两种技术路线的优劣
+- **核心内容与视觉构思**:
+  - **布局**: 上下对比结构
+  - **上半部分**:
+    - **构思**: 淡蓝背景卡片(`bg-blue-100`)
+    - **标题**: "路线A" + 图标 "⚙️"
+  - **下半部分**:
+    - **构思**: 淡绿背景卡片(`bg-green-100`)
+    - **标题**: "路线B" + 图标 "🚀"
+
+这不是模糊描述，而是AI可以100%理解并执行的"代码"。
+
+### 【页面设计规范】
+1. **技术指向性**
+   - 具体的CSS类名和颜色代码
+   - 明确的布局结构和元素位置
+   - 精确的图标和视觉元素选择
+
+2. **完整性保证**
+   - 每页都有完整的设计方案
+   - 文案与视觉的精确匹配
+   - 从标题到细节的全面覆盖
+
+3. **一致性维护**
+   - 整体风格的统一协调
+   - 品牌色彩的一致应用
+   - 设计语言的连贯表达
+
+### 【输出规范】
+必须返回严格的JSON格式：
+
+```json
+__OUTPUT_EXAMPLE__
 ```
 
 ### 【质量标准】
@@ -199,14 +226,11 @@ class AtomicDesignerEngine(BaseWorkflowEngine):
 - **可执行性**：技术实现路径清晰明确
 
 现在请根据叙事架构，设计精确的页面施工图。
-"""
-
-        user_template = """
-请为以下内容设计精确的页面施工图：
+""".replace("__OUTPUT_EXAMPLE__", _compact_output_example(_DESIGN_OUTPUT_EXAMPLE))
 
-**主题**: {topic}
-
-**叙事架构**: {narrative_summary}
+# 固定的任务说明在前、变量放在最后，使每次调用共享的静态前缀尽可能长
+DESIGN_USER_TEMPLATE = """
+请为以下内容设计精确的页面施工图。
 
 **设计要求**:
 1. 为每一页生成精确的设计施工图
@@ -216,18 +240,255 @@ class AtomicDesignerEngine(BaseWorkflowEngine):
 5. 输出完整的小红书发布方案
 
 请严格按照JSON格式输出完整的原子设计规范。
+
+**主题**: {topic}
+
+**叙事架构**: {narrative_summary}
 """
 
-        self.design_prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("human", user_template)
-        ])
+# 静态系统提示词放在消息最前面，每次调用的前缀完全相同，可命中模型服务端的隐式前缀缓存；
+# 动态内容只出现在人类消息中。模板在导入时构建一次，所有引擎实例共享
+_DESIGN_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", DESIGN_SYSTEM_PROMPT),
+    ("human", DESIGN_USER_TEMPLATE)
+])
+
+# 模型输出的结构约束：下游引擎（视觉编码器等）直接读取的字段必须存在且类型正确
+ATOMIC_DESIGN_SCHEMA = {
+    "type": "object",
+    "required": ["publication_package", "page_design_specs"],
+    "properties": {
+        "publication_package": {
+            "type": "object",
+            "required": ["xiaohongshu_titles", "xiaohongshu_content"],
+            "properties": {
+                "xiaohongshu_titles": {"type": "array", "minItems": 1, "items": {"type": "string"}},
+                "xiaohongshu_content": {"type": "object"},
+                "content_metadata": {"type": "object"}
+            }
+        },
+        "page_design_specs": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["page_number", "page_title"],
+                "properties": {
+                    "page_number": {"type": "integer"},
+                    "page_type": {"type": "string"},
+                    "page_title": {"type": "string"}
+                }
+            }
+        },
+        "design_system": {
+            "type": "object",
+            "properties": {
+                "brand_guidelines": {"type": "object"}
+            }
+        },
+        "production_notes": {"type": "object"}
+    }
+}
+
+# 导入时将schema编译为Python校验函数，每次调用无需重新解析schema
+_validate_design = fastjsonschema.compile(ATOMIC_DESIGN_SCHEMA) if fastjsonschema is not None else None
+
+# ===================================
+# 备用设计的页面模板
+# ===================================
+
+# 页面类型 -> 备用设计规格中随类型变化的取值，由_build_page_spec组装为完整规格。
+# 文本中的{topic}在组装时替换为主题；元组字段依次对应输出中字典的各个键：
+#   sections: (section_name, section_purpose, content_elements, visual_treatment)
+#   body: (content_type, content_text, visual_emphasis, formatting)
+#   colors: (primary_color, secondary_color, background_color, text_color)
+#   typography: (title_font, body_font, emphasis_treatment)
+#   visual_elements: (element_type, element_description, placement, size_specification, style_treatment)
+_PAGE_VARIANTS = {
+    "封面页": {
+        "layout_type": "居中布局",
+        "sections": (
+            ("主标题区", "吸引注意力", ("大标题", "副标题", "装饰元素"), "大字体、高对比度"),
+        ),
+        "subheadline": "关于{topic}的系统性指南",
+        "body": (
+            ("标签", "干货分享 | 实用技巧 | 避坑指南", "标签样式", "小字体、彩色背景"),
+        ),
+        "supporting_elements": ("作者信息", "品牌标识"),
+        "colors": ("#2563eb", "#3b82f6", "#f8fafc", "#1e293b"),
+        "typography": ("加粗32px", "常规16px", "颜色强调"),
+        "visual_elements": (
+            ("图标", "主题相关图标", "标题旁边", "24px", "线性图标风格"),
+        ),
+        "css_classes": ("cover-page", "text-center", "bg-blue-50"),
+        "layout_code": "flex flex-col items-center justify-center",
+        "responsive_notes": "移动端优先设计",
+        "accessibility_considerations": "确保文字对比度符合WCAG标准"
+    },
+    "内容页": {
+        "layout_type": "单栏布局",
+        "sections": (
+            ("标题区", "明确页面主题", ("页面标题", "页码"), "清晰层次"),
+            ("内容区", "传递核心信息", ("要点列表", "说明文字"), "结构化展示"),
+        ),
+        "subheadline": None,
+        "body": (
+            ("列表", "{topic}的核心要点列表", "项目符号", "间距清晰的列表"),
+        ),
+        "supporting_elements": ("小贴士", "注意事项"),
+        "colors": ("#10b981", "#34d399", "#ffffff", "#374151"),
+        "typography": ("加粗24px", "常规16px", "颜色和字重强调"),
+        "visual_elements": (
+            ("装饰线", "分割线装饰", "标题下方", "2px高度", "渐变色彩"),
+        ),
+        "css_classes": ("content-page", "bg-white", "text-gray-700"),
+        "layout_code": "space-y-4 p-6",
+        "responsive_notes": "确保在小屏幕上可读性",
+        "accessibility_considerations": "合理的标题层级结构"
+    },
+    "对比页": {
+        "layout_type": "上下对比",
+        "sections": (
+            ("错误示例区", "展示错误做法", ("错误标识", "错误内容"), "红色警示风格"),
+            ("正确示例区", "展示正确做法", ("正确标识", "正确内容"), "绿色确认风格"),
+        ),
+        "subheadline": "对比学习，避免踩坑",
+        "body": (
+            ("对比项", "{topic}的正确vs错误做法", "对比色彩", "卡片式对比布局"),
+        ),
+        "supporting_elements": ("提示说明", "记忆口诀"),
+        "colors": ("#ef4444", "#10b981", "#f9fafb", "#111827"),
+        "typography": ("加粗24px", "常规16px", "背景色块强调"),
+        "visual_elements": (
+            ("对比图标", "❌和✅图标", "每个对比项前", "20px", "彩色图标"),
+        ),
+        "css_classes": ("comparison-page", "bg-gray-50"),
+        "layout_code": "grid grid-cols-1 gap-4",
+        "responsive_notes": "确保对比清晰可见",
+        "accessibility_considerations": "使用图标和颜色双重指示"
+    },
+    "结尾页": {
+        "layout_type": "居中布局",
+        "sections": (
+            ("总结区", "内容回顾", ("关键要点", "行动建议"), "突出重点"),
+            ("互动区", "引导参与", ("点赞提醒", "评论引导"), "友好邀请"),
+        ),
+        "subheadline": "感谢阅读，一起成长",
+        "body": (
+            ("总结", "掌握{topic}的关键要点总结", "要点标记", "简洁明了的要点列表"),
+            ("互动", "点赞收藏，评论分享你的经验", "按钮样式", "行动按钮设计"),
+        ),
+        "supporting_elements": ("作者信息", "关注提醒"),
+        "colors": ("#8b5cf6", "#a78bfa", "#ffffff", "#1f2937"),
+        "typography": ("加粗28px", "常规16px", "渐变色彩"),
+        "visual_elements": (
+            ("装饰元素", "庆祝图标或徽章", "页面中心", "48px", "彩色渐变"),
+        ),
+        "css_classes": ("final-page", "text-center", "bg-white"),
+        "layout_code": "flex flex-col items-center space-y-6",
+        "responsive_notes": "确保在所有设备上居中显示",
+        "accessibility_considerations": "清晰的行动指引"
+    }
+}
+
+def _build_page_spec(page_type: str, page_number: int, page_title: str, topic: str) -> Dict[str, Any]:
+    """
+    按页面类型组装备用设计规格
+    
+    每次调用都构建新的字典和列表，调用方可以自由修改返回结果。
+    
+    Args:
+        page_type (str): 页面类型，须为_PAGE_VARIANTS中的键
+        page_number (int): 页码
+        page_title (str): 页面标题
+        topic (str): 内容主题
+    
+    Returns:
+        Dict[str, Any]: 单页设计规格
+    """
+    variant = _PAGE_VARIANTS[page_type]
+    subheadline = variant["subheadline"]
+    primary, secondary, background, text = variant["colors"]
+    title_font, body_font, emphasis = variant["typography"]
+    
+    return {
+        "page_number": page_number,
+        "page_type": page_type,
+        "page_title": page_title,
+        "layout_structure": {
+            "layout_type": variant["layout_type"],
+            "main_sections": [
+                {
+                    "section_name": name,
+                    "section_purpose": purpose,
+                    "content_elements": list(elements),
+                    "visual_treatment": treatment
+                }
+                for name, purpose, elements, treatment in variant["sections"]
+            ]
+        },
+        "content_specification": {
+            "headline": page_title,
+            "subheadline": subheadline.format(topic=topic) if subheadline else subheadline,
+            "body_content": [
+                {
+                    "content_type": content_type,
+                    "content_text": content_text.format(topic=topic),
+                    "visual_emphasis": visual_emphasis,
+                    "formatting": formatting
+                }
+                for content_type, content_text, visual_emphasis, formatting in variant["body"]
+            ],
+            "supporting_elements": list(variant["supporting_elements"])
+        },
+        "visual_design": {
+            "color_scheme": {
+                "primary_color": primary,
+                "secondary_color": secondary,
+                "background_color": background,
+                "text_color": text
+            },
+            "typography": {
+                "title_font": title_font,
+                "body_font": body_font,
+                "emphasis_treatment": emphasis
+            },
+            "visual_elements": [
+                {
+                    "element_type": element_type,
+                    "element_description": description,
+                    "placement": placement,
+                    "size_specification": size,
+                    "style_treatment": style
+                }
+                for element_type, description, placement, size, style in variant["visual_elements"]
+            ]
+        },
+        "technical_implementation": {
+            "css_classes": list(variant["css_classes"]),
+            "layout_code": variant["layout_code"],
+            "responsive_notes": variant["responsive_notes"],
+            "accessibility_considerations": variant["accessibility_considerations"]
+        }
+    }
+
+class AtomicDesignerEngine(BaseWorkflowEngine):
+    """原子设计师引擎 - 页面布局设计"""
+    
+    def __init__(self, llm):
+        super().__init__(llm)
+        self.engine_name = "atomic_designer"
+        self._initialize_design_chain()
+    
+    def _initialize_design_chain(self):
+        """初始化原子设计链"""
+        self.design_prompt = _DESIGN_PROMPT
         
-        self.design_chain = (
-            self.design_prompt
-            | self.llm
-            | StrOutputParser()
-        )
+        # 模型返回的消息先记录缓存命中情况，再解析为文本
+        self.design_chain = self.design_prompt | self.llm
+        self.output_parser = StrOutputParser()
+        # 流式输出过程中解析不完整的JSON，供调用方提前使用已生成的部分
+        self.json_parser = JsonOutputParser()
     
     async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         """执行原子设计"""
@@ -235,41 +496,64 @@ class AtomicDesignerEngine(BaseWorkflowEngine):
         narrative = inputs.get("narrative", {})
         insights = inputs.get("insights", {})
         force_regenerate = inputs.get("force_regenerate", False)
+        # 可选回调：流式生成过程中每解析出新的部分设计就调用一次
+        on_partial_design = inputs.get("on_partial_design")
         
-        self.logger.info(f"⚛️ 原子设计师引擎启动 - 主题: {topic}")
-        
-        # 检查缓存
-        if not force_regenerate:
-            cached_result = self.load_cache(topic, "atomic_designer.json")
-            if cached_result:
-                self.logger.info("✓ 使用缓存的原子设计")
-                return cached_result
+        self.logger.info("⚛️ 原子设计师引擎启动 - 主题: %s", topic)
         
         try:
             # 提取叙事摘要
             narrative_summary = self._extract_narrative_summary(narrative)
             
+            # 按调用内容寻址的LLM结果缓存（相同模型、参数和输入直接复用），关闭缓存时不读也不写
+            llm_cache = get_llm_cache() if self.cache_enabled else None
+            llm_cache_key = make_cache_key(
+                model=getattr(self.llm, "model", None) or getattr(self.llm, "model_name", None),
+                temperature=getattr(self.llm, "temperature", None),
+                topic=topic,
+                narrative_summary=narrative_summary
+            )
+            if llm_cache is not None and not force_regenerate:
+                cached_design = await llm_cache.get(llm_cache_key)
+                if cached_design is not None:
+                    self.logger.info("✓ 命中LLM结果缓存")
+                    return cached_design
+                
+                # 按主题保存的文件缓存只在叙事摘要相同时复用（磁盘读取放到线程中执行，不阻塞其他引擎）
+                cached_result = await asyncio.to_thread(self._load_design_cache, topic)
+                if cached_result and cached_result.get("narrative_reference") == narrative_summary:
+                    self.logger.info("✓ 使用缓存的原子设计")
+                    await llm_cache.set(llm_cache_key, cached_result, ttl=86400)
+                    return cached_result
+            
             # 执行原子设计链
             self.logger.info("执行原子设计...")
-            result_text = await self.design_chain.ainvoke({
+            response = await self._stream_design({
                 "topic": topic,
                 "narrative_summary": narrative_summary
-            })
+            }, on_partial_design)
+            self._log_prompt_cache_usage(response)
+            result_text = self.output_parser.invoke(response)
             
             # 解析JSON结果
+            parsed = True
             try:
-                cleaned_text = result_text.strip()
-                if cleaned_text.startswith("```json"):
-                    cleaned_text = cleaned_text[7:]
-                if cleaned_text.endswith("```"):
-                    cleaned_text = cleaned_text[:-3]
-                cleaned_text = cleaned_text.strip()
-                
-                design_result = json.loads(cleaned_text)
+                design_text = _FENCE_RE.sub("", result_text)
+                design_result = orjson.loads(design_text) if orjson is not None else json.loads(design_text)
                 
             except json.JSONDecodeError as e:
-                self.logger.error(f"JSON解析失败: {e}")
+                self.logger.error("JSON解析失败: %s", e)
                 design_result = self._get_fallback_design(topic, narrative)
+                parsed = False
+            
+            # 校验结构，不符合约束的结果会导致下游引擎出错，按解析失败处理
+            if parsed and _validate_design is not None:
+                try:
+                    _validate_design(design_result)
+                except fastjsonschema.JsonSchemaException as e:
+                    self.logger.error("设计结构校验失败: %s", e)
+                    design_result = self._get_fallback_design(topic, narrative)
+                    parsed = False
             
             # 添加引擎元数据
             final_result = {
@@ -281,14 +565,20 @@ class AtomicDesignerEngine(BaseWorkflowEngine):
                 "execution_status": "success"
             }
             
+            # 写入LLM结果缓存（回退设计不写入，下次仍会重新调用）
+            if parsed and llm_cache is not None:
+                await llm_cache.set(llm_cache_key, final_result, ttl=86400)
+            
             # 保存缓存
-            self.save_cache(topic, final_result, "atomic_designer.json")
+            await asyncio.to_thread(self._save_design_cache, topic, final_result)
             
+            if llm_cache is not None and self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("LLM结果缓存统计: %s", llm_cache.get_stats())
             self.logger.info("✓ 原子设计完成")
             return final_result
             
         except Exception as e:
-            self.logger.error(f"原子设计师引擎执行失败: {str(e)}")
+            self.logger.error("原子设计师引擎执行失败: %s", e)
             return {
                 "engine": "atomic_designer",
                 "version": "1.0.0",
@@ -298,22 +588,108 @@ class AtomicDesignerEngine(BaseWorkflowEngine):
                 "error": str(e)
             }
     
+    def _load_design_cache(self, topic: str) -> Optional[Dict[str, Any]]:
+        """从引擎缓存中读取完整的设计结果，没有缓存时返回None"""
+        cached_output = self.load_cache(topic)
+        if cached_output is None or not isinstance(cached_output.content, dict):
+            return None
+        return cached_output.content
+    
+    def _save_design_cache(self, topic: str, final_result: Dict[str, Any]):
+        """将完整的设计结果作为JSON内容保存到引擎缓存"""
+        output = self.create_output(topic, ContentType.TECHNICAL)
+        output.set_content(final_result, OutputFormat.JSON)
+        self.save_cache(output)
+    
+    async def execute_many(self, inputs_list: List[Dict[str, Any]], max_concurrency: int = 8) -> List[Dict[str, Any]]:
+        """
+        批量执行多个主题的原子设计
+        
+        各主题并发执行，同时进行的模型调用数不超过max_concurrency；
+        每个主题仍独立走缓存检查、结构校验和备用设计流程。
+        单个主题抛出异常时只记录该主题的失败结果，不影响其他主题。
+        
+        Args:
+            inputs_list (List[Dict[str, Any]]): 每个主题的执行输入，格式同execute
+            max_concurrency (int): 最大并发数
+        
+        Returns:
+            List[Dict[str, Any]]: 与输入顺序一致的执行结果
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(inputs: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    return await self.execute(inputs)
+                except Exception as e:
+                    self.logger.error("原子设计批量执行失败 - 主题: %s，错误: %s", inputs.get("topic", ""), e)
+                    return {
+                        "engine": "atomic_designer",
+                        "version": "1.0.0",
+                        "topic": inputs.get("topic", ""),
+                        "execution_status": "failed",
+                        "error": str(e)
+                    }
+        
+        return list(await asyncio.gather(*(run_one(inputs) for inputs in inputs_list)))
+    
+    async def _stream_design(self, chain_inputs: Dict[str, Any], on_partial_design=None):
+        """
+        流式执行原子设计链，返回合并后的完整模型消息
+        
+        提供on_partial_design时，每收到一段输出就解析当前的不完整JSON，
+        结果有变化时回调（标题、各页设计规范生成后即可使用）；未提供时只合并消息。
+        """
+        response = None
+        last_partial = None
+        
+        async for chunk in self.design_chain.astream(chain_inputs):
+            response = chunk if response is None else response + chunk
+            
+            if on_partial_design is None:
+                continue
+            partial = self.json_parser.parse_result(
+                [Generation(text=self.output_parser.invoke(response))], partial=True
+            )
+            if partial and partial != last_partial:
+                last_partial = partial
+                on_partial_design(partial)
+        
+        if response is None:
+            raise ValueError("模型未返回任何内容")
+        return response
+    
+    def _log_prompt_cache_usage(self, response: Any):
+        """记录本次调用输入token中命中提示词缓存的数量（模型未返回用量信息时跳过）"""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        usage = getattr(response, "usage_metadata", None)
+        if not usage:
+            return
+        
+        cache_read = (usage.get("input_token_details") or {}).get("cache_read", 0)
+        self.logger.debug("提示词缓存: 输入token %s，命中缓存 %s", usage.get("input_tokens", 0), cache_read)
+    
     def _extract_narrative_summary(self, narrative: Dict[str, Any]) -> str:
         """提取叙事摘要"""
         if not narrative:
             return "标准内容叙事结构"
         
-        narrative_data = narrative.get("narrative_data", {})
+        # 用 `or` 兜底缺失或为None的字段，命中时不会构造多余的空字典
+        narrative_data = narrative.get("narrative_data") or {}
         
-        story_theme = narrative_data.get("narrative_overview", {}).get("story_theme", "")
-        total_pages = narrative_data.get("content_series", {}).get("total_pages", 6)
-        content_flow = narrative_data.get("content_series", {}).get("content_flow", "")
+        story_theme = (narrative_data.get("narrative_overview") or {}).get("story_theme", "")
+        content_series = narrative_data.get("content_series") or {}
+        total_pages = content_series.get("total_pages", 6)
+        content_flow = content_series.get("content_flow", "")
         
-        page_titles = [page.get("page_title", "") for page in narrative_data.get("page_breakdown", [])]
+        # 摘要只展示前3页标题
+        page_titles = [page.get("page_title", "") for page in (narrative_data.get("page_breakdown") or ())[:3]]
         
         summary = f"主题: {story_theme} | 页数: {total_pages} | 流程: {content_flow}"
         if page_titles:
-            summary += f" | 标题: {' → '.join(page_titles[:3])}..."
+            summary += f" | 标题: {' → '.join(page_titles)}..."
         
         return summary
     
@@ -383,291 +759,23 @@ class AtomicDesignerEngine(BaseWorkflowEngine):
         page_type = page_info.get("page_type", "内容页")
         page_title = page_info.get("page_title", f"{topic}相关内容")
         
-        # 根据页面类型选择不同的设计模板
-        if page_type == "封面页":
-            return self._create_cover_page_spec(page_number, page_title, topic)
-        elif page_type == "对比页":
-            return self._create_comparison_page_spec(page_number, page_title, topic)
-        elif page_type == "结尾页":
-            return self._create_final_page_spec(page_number, page_title, topic)
-        else:
-            return self._create_content_page_spec(page_number, page_title, topic)
-    
-    def _create_cover_page_spec(self, page_number: int, page_title: str, topic: str) -> Dict[str, Any]:
-        """创建封面页规格"""
-        return {
-            "page_number": page_number,
-            "page_type": "封面页",
-            "page_title": page_title,
-            "layout_structure": {
-                "layout_type": "居中布局",
-                "main_sections": [
-                    {
-                        "section_name": "主标题区",
-                        "section_purpose": "吸引注意力",
-                        "content_elements": ["大标题", "副标题", "装饰元素"],
-                        "visual_treatment": "大字体、高对比度"
-                    }
-                ]
-            },
-            "content_specification": {
-                "headline": page_title,
-                "subheadline": f"关于{topic}的系统性指南",
-                "body_content": [
-                    {
-                        "content_type": "标签",
-                        "content_text": "干货分享 | 实用技巧 | 避坑指南",
-                        "visual_emphasis": "标签样式",
-                        "formatting": "小字体、彩色背景"
-                    }
-                ],
-                "supporting_elements": ["作者信息", "品牌标识"]
-            },
-            "visual_design": {
-                "color_scheme": {
-                    "primary_color": "#2563eb",
-                    "secondary_color": "#3b82f6",
-                    "background_color": "#f8fafc", 
-                    "text_color": "#1e293b"
-                },
-                "typography": {
-                    "title_font": "加粗32px",
-                    "body_font": "常规16px",
-                    "emphasis_treatment": "颜色强调"
-                },
-                "visual_elements": [
-                    {
-                        "element_type": "图标",
-                        "element_description": "主题相关图标",
-                        "placement": "标题旁边",
-                        "size_specification": "24px",
-                        "style_treatment": "线性图标风格"
-                    }
-                ]
-            },
-            "technical_implementation": {
-                "css_classes": ["cover-page", "text-center", "bg-blue-50"],
-                "layout_code": "flex flex-col items-center justify-center",
-                "responsive_notes": "移动端优先设计",
-                "accessibility_considerations": "确保文字对比度符合WCAG标准"
-            }
-        }
-    
-    def _create_content_page_spec(self, page_number: int, page_title: str, topic: str) -> Dict[str, Any]:
-        """创建内容页规格"""
-        return {
-            "page_number": page_number,
-            "page_type": "内容页",
-            "page_title": page_title,
-            "layout_structure": {
-                "layout_type": "单栏布局",
-                "main_sections": [
-                    {
-                        "section_name": "标题区",
-                        "section_purpose": "明确页面主题",
-                        "content_elements": ["页面标题", "页码"],
-                        "visual_treatment": "清晰层次"
-                    },
-                    {
-                        "section_name": "内容区",
-                        "section_purpose": "传递核心信息",
-                        "content_elements": ["要点列表", "说明文字"],
-                        "visual_treatment": "结构化展示"
-                    }
-                ]
-            },
-            "content_specification": {
-                "headline": page_title,
-                "subheadline": None,
-                "body_content": [
-                    {
-                        "content_type": "列表",
-                        "content_text": f"{topic}的核心要点列表",
-                        "visual_emphasis": "项目符号",
-                        "formatting": "间距清晰的列表"
-                    }
-                ],
-                "supporting_elements": ["小贴士", "注意事项"]
-            },
-            "visual_design": {
-                "color_scheme": {
-                    "primary_color": "#10b981",
-                    "secondary_color": "#34d399", 
-                    "background_color": "#ffffff",
-                    "text_color": "#374151"
-                },
-                "typography": {
-                    "title_font": "加粗24px",
-                    "body_font": "常规16px",
-                    "emphasis_treatment": "颜色和字重强调"
-                },
-                "visual_elements": [
-                    {
-                        "element_type": "装饰线",
-                        "element_description": "分割线装饰",
-                        "placement": "标题下方",
-                        "size_specification": "2px高度",
-                        "style_treatment": "渐变色彩"
-                    }
-                ]
-            },
-            "technical_implementation": {
-                "css_classes": ["content-page", "bg-white", "text-gray-700"],
-                "layout_code": "space-y-4 p-6",
-                "responsive_notes": "确保在小屏幕上可读性",
-                "accessibility_considerations": "合理的标题层级结构"
-            }
-        }
-    
-    def _create_comparison_page_spec(self, page_number: int, page_title: str, topic: str) -> Dict[str, Any]:
-        """创建对比页规格"""
-        return {
-            "page_number": page_number,
-            "page_type": "对比页", 
-            "page_title": page_title,
-            "layout_structure": {
-                "layout_type": "上下对比",
-                "main_sections": [
-                    {
-                        "section_name": "错误示例区",
-                        "section_purpose": "展示错误做法",
-                        "content_elements": ["错误标识", "错误内容"],
-                        "visual_treatment": "红色警示风格"
-                    },
-                    {
-                        "section_name": "正确示例区", 
-                        "section_purpose": "展示正确做法",
-                        "content_elements": ["正确标识", "正确内容"],
-                        "visual_treatment": "绿色确认风格"
-                    }
-                ]
-            },
-            "content_specification": {
-                "headline": page_title,
-                "subheadline": "对比学习，避免踩坑",
-                "body_content": [
-                    {
-                        "content_type": "对比项",
-                        "content_text": f"{topic}的正确vs错误做法",
-                        "visual_emphasis": "对比色彩",
-                        "formatting": "卡片式对比布局"
-                    }
-                ],
-                "supporting_elements": ["提示说明", "记忆口诀"]
-            },
-            "visual_design": {
-                "color_scheme": {
-                    "primary_color": "#ef4444",
-                    "secondary_color": "#10b981",
-                    "background_color": "#f9fafb",
-                    "text_color": "#111827"
-                },
-                "typography": {
-                    "title_font": "加粗24px",
-                    "body_font": "常规16px", 
-                    "emphasis_treatment": "背景色块强调"
-                },
-                "visual_elements": [
-                    {
-                        "element_type": "对比图标",
-                        "element_description": "❌和✅图标",
-                        "placement": "每个对比项前",
-                        "size_specification": "20px",
-                        "style_treatment": "彩色图标"
-                    }
-                ]
-            },
-            "technical_implementation": {
-                "css_classes": ["comparison-page", "bg-gray-50"],
-                "layout_code": "grid grid-cols-1 gap-4",
-                "responsive_notes": "确保对比清晰可见",
-                "accessibility_considerations": "使用图标和颜色双重指示"
-            }
-        }
-    
-    def _create_final_page_spec(self, page_number: int, page_title: str, topic: str) -> Dict[str, Any]:
-        """创建结尾页规格"""
-        return {
-            "page_number": page_number,
-            "page_type": "结尾页",
-            "page_title": page_title,
-            "layout_structure": {
-                "layout_type": "居中布局",
-                "main_sections": [
-                    {
-                        "section_name": "总结区",
-                        "section_purpose": "内容回顾",
-                        "content_elements": ["关键要点", "行动建议"],
-                        "visual_treatment": "突出重点"
-                    },
-                    {
-                        "section_name": "互动区",
-                        "section_purpose": "引导参与",
-                        "content_elements": ["点赞提醒", "评论引导"],
-                        "visual_treatment": "友好邀请"
-                    }
-                ]
-            },
-            "content_specification": {
-                "headline": page_title,
-                "subheadline": "感谢阅读，一起成长",
-                "body_content": [
-                    {
-                        "content_type": "总结",
-                        "content_text": f"掌握{topic}的关键要点总结",
-                        "visual_emphasis": "要点标记",
-                        "formatting": "简洁明了的要点列表"
-                    },
-                    {
-                        "content_type": "互动",
-                        "content_text": "点赞收藏，评论分享你的经验",
-                        "visual_emphasis": "按钮样式",
-                        "formatting": "行动按钮设计"
-                    }
-                ],
-                "supporting_elements": ["作者信息", "关注提醒"]
-            },
-            "visual_design": {
-                "color_scheme": {
-                    "primary_color": "#8b5cf6",
-                    "secondary_color": "#a78bfa",
-                    "background_color": "#ffffff",
-                    "text_color": "#1f2937"
-                },
-                "typography": {
-                    "title_font": "加粗28px",
-                    "body_font": "常规16px",
-                    "emphasis_treatment": "渐变色彩"
-                },
-                "visual_elements": [
-                    {
-                        "element_type": "装饰元素",
-                        "element_description": "庆祝图标或徽章",
-                        "placement": "页面中心",
-                        "size_specification": "48px",
-                        "style_treatment": "彩色渐变"
-                    }
-                ]
-            },
-            "technical_implementation": {
-                "css_classes": ["final-page", "text-center", "bg-white"],
-                "layout_code": "flex flex-col items-center space-y-6",
-                "responsive_notes": "确保在所有设备上居中显示",
-                "accessibility_considerations": "清晰的行动指引"
-            }
-        }
+        # 根据页面类型选择不同的设计模板，未知类型按内容页处理
+        if page_type not in _PAGE_VARIANTS:
+            page_type = "内容页"
+        return _build_page_spec(page_type, page_number, page_title, topic)
     
     def get_design_summary(self, topic: str) -> Optional[Dict[str, Any]]:
         """获取设计摘要"""
-        cached_result = self.load_cache(topic, "atomic_designer.json")
+        cached_result = self._load_design_cache(topic)
         if not cached_result:
             return None
         
         design_data = cached_result.get("design_data", {})
+        design_system = design_data.get("design_system", {})
         
         return {
             "xiaohongshu_titles": design_data.get("publication_package", {}).get("xiaohongshu_titles", []),
             "total_pages": len(design_data.get("page_design_specs", [])),
-            "design_style": design_data.get("design_system", {}).get("visual_consistency", {}).get("style_guidelines", ""),
-            "color_palette": design_data.get("design_system", {}).get("brand_guidelines", {}).get("color_palette", [])
+            "design_style": design_system.get("visual_consistency", {}).get("style_guidelines", ""),
+            "color_palette": design_system.get("brand_guidelines", {}).get("color_palette", [])
         } 
\ No newline at end of file
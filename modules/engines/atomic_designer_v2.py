@@ -5,10 +5,34 @@
 目标：将叙事内容分解为可复用的原子级内容单元，构建清晰的信息架构
 """
 
+import json
+import re
 from typing import Dict, Any, List
 from modules.engines.base_engine_v2 import TechnicalEngine
 from modules.core.output import ContentType, OutputFormat
 
+# orjson为可选依赖，未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError是json.JSONDecodeError的子类，两种实现的解析错误处理方式相同
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# 模型输出中的```json代码块，导入时编译一次
+_JSON_FENCE_RE = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+
+# 从文本中间解析出第一个完整JSON对象（C实现的扫描，正确处理字符串内的括号和转义）
+_JSON_DECODER = json.JSONDecoder()
+
+# 设计质量评分表：一级字段 -> ((二级字段, 分值), ...)；二级字段为None表示检查一级字段本身
+_DESIGN_QUALITY_RULES = (
+    ("atomic_design", (("atoms", 2), ("molecules", 2), ("organisms", 2))),
+    ("design_system", (("colors", 1), ("typography", 1))),
+    ("implementation_guide", ((None, 2),)),
+)
+
 class AtomicDesignerEngineV2(TechnicalEngine):
     """原子设计师引擎 V2.0"""
     
@@ -137,11 +161,7 @@ class AtomicDesignerEngineV2(TechnicalEngine):
             output.set_structured_data(design_data)
             
             # 同时保持JSON字符串作为主要内容
-            import json
-            output.set_content(
-                json.dumps(design_data, ensure_ascii=False, indent=2),
-                OutputFormat.JSON
-            )
+            output.set_content(self._dump_design(design_data), OutputFormat.JSON)
         
         # 添加设计相关元数据
         output.set_metadata(
@@ -155,36 +175,38 @@ class AtomicDesignerEngineV2(TechnicalEngine):
             design_quality=self._assess_design_quality(design_data)
         )
     
+    @staticmethod
+    def _dump_design(design_data: Dict[str, Any]) -> str:
+        """
+        将设计数据序列化为2空格缩进的JSON，安装了orjson时使用orjson
+        
+        orjson把NaN/Infinity写成null，保证输出是合法JSON（标准库写出的NaN无法被orjson再次读取）。
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(design_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+            except TypeError:
+                # orjson不支持超过64位的整数，交给标准库json处理
+                pass
+        return json.dumps(design_data, ensure_ascii=False, indent=2)
+    
     def _parse_and_validate_json(self, content: str) -> Dict[str, Any]:
         """解析和验证JSON内容"""
-        import json
-        import re
-        
         try:
             # 尝试直接解析
             if content.strip().startswith('{'):
-                return json.loads(content)
-            
-            # 从文本中提取JSON
-            json_pattern = r'```json\s*(\{.*?\})\s*```'
-            json_matches = re.findall(json_pattern, content, re.DOTALL)
+                return _json_loads(content)
             
-            if json_matches:
-                return json.loads(json_matches[0])
+            # 从文本中提取JSON（只需要第一个代码块，找到即停止扫描）
+            fence_match = _JSON_FENCE_RE.search(content)
+            if fence_match:
+                return _json_loads(fence_match.group(1))
             
-            # 查找第一个JSON对象
+            # 查找第一个JSON对象，解析到对象结束处为止，忽略其后的说明文字
             start_idx = content.find('{')
             if start_idx != -1:
-                # 简单的括号匹配
-                bracket_count = 0
-                for i, char in enumerate(content[start_idx:], start_idx):
-                    if char == '{':
-                        bracket_count += 1
-                    elif char == '}':
-                        bracket_count -= 1
-                        if bracket_count == 0:
-                            json_str = content[start_idx:i+1]
-                            return json.loads(json_str)
+                design_data, _ = _JSON_DECODER.raw_decode(content, start_idx)
+                return design_data
             
             # 如果无法解析，返回默认结构
             return self._create_default_structure(content)
@@ -289,23 +311,14 @@ class AtomicDesignerEngineV2(TechnicalEngine):
         
         quality_score = 0
         
-        # 检查原子设计完整性
-        if design_data.get("atomic_design", {}).get("atoms"):
-            quality_score += 2
-        if design_data.get("atomic_design", {}).get("molecules"):
-            quality_score += 2
-        if design_data.get("atomic_design", {}).get("organisms"):
-            quality_score += 2
-        
-        # 检查设计系统
-        if design_data.get("design_system", {}).get("colors"):
-            quality_score += 1
-        if design_data.get("design_system", {}).get("typography"):
-            quality_score += 1
-        
-        # 检查实现指南
-        if design_data.get("implementation_guide"):
-            quality_score += 2
+        # 每个一级字段只取一次，再按评分表检查原子设计、设计系统和实现指南
+        for section_key, checks in _DESIGN_QUALITY_RULES:
+            section = design_data.get(section_key)
+            if not section:
+                continue
+            for field_key, score in checks:
+                if field_key is None or section.get(field_key):
+                    quality_score += score
         
         if quality_score >= 8:
             return "high"
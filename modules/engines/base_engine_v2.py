@@ -73,9 +73,9 @@ class BaseEngineV2(BaseWorkflowEngine):
         
         self.logger.info(f"🎭 {self.engine_name} 引擎启动 - 主题: {topic}")
         
-        # 检查缓存
+        # 检查缓存（磁盘读取放到线程中执行，不阻塞事件循环上并发运行的其他引擎）
         if not force_regenerate:
-            cached_output = self.load_cache(topic)
+            cached_output = await asyncio.to_thread(self.load_cache, topic)
             if cached_output:
                 self.logger.info("✓ 使用缓存结果")
                 return cached_output.to_dict()
@@ -103,7 +103,7 @@ class BaseEngineV2(BaseWorkflowEngine):
             output.validate()
             
             # 保存缓存
-            self.save_cache(output)
+            await asyncio.to_thread(self.save_cache, output)
             
             self.logger.info(f"✓ {self.engine_name} 引擎执行成功")
             return output.to_dict()
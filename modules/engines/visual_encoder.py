@@ -1103,10 +1103,11 @@ class VisualEncoderEngine(BaseWorkflowEngine):
             return None
         
         code_data = cached_result.get("code_data", {})
+        html_generation = code_data.get("html_generation", {})
         
         return {
-            "total_pages": code_data.get("html_generation", {}).get("total_pages", 0),
-            "technical_stack": code_data.get("html_generation", {}).get("technical_stack", ""),
+            "total_pages": html_generation.get("total_pages", 0),
+            "technical_stack": html_generation.get("technical_stack", ""),
             "css_features": code_data.get("design_implementation", {}).get("color_system", {}).get("css_variables", {}),
             "page_codes": [page.get("page_title", "") for page in code_data.get("page_codes", [])]
         } 
\ No newline at end of file
@@ -18,7 +18,7 @@ import logging
 from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 import time
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
 
 # 导入项目配置和工具
@@ -29,7 +29,7 @@ from config import (
     DESIGN_SPEC_FILENAME, FINAL_HTML_FILENAME, HTML_BASE_STYLE, XIAOHONGSHU_IMAGE_WIDTH, XIAOHONGSHU_IMAGE_HEIGHT,
     SCREENSHOT_CONFIG, COVER_PAGE_TEMPLATE, CONTENT_PAGE_TEMPLATE, COMPARISON_PAGE_TEMPLATE, FINAL_PAGE_TEMPLATE
 )
-from modules.utils import save_json, load_json, get_logger
+from modules.utils import save_json, load_json, get_logger, ensure_dir, write_json_file
 
 # 导入数据模型
 from modules.models import DesignSpecification
@@ -40,6 +40,9 @@ from modules.models import DesignSpecification
 
 logger = get_logger(__name__)
 
+# 日志分隔线
+_SEP_EQ = "=" * 80
+
 # ===================================
 # 核心AI调用函数
 # ===================================
@@ -345,10 +348,13 @@ def _fix_json_issues(json_str: str) -> str:
 # 叙事与设计阶段
 # ===================================
 
-def _generate_design_specification(blueprint: Dict[str, Any], theme: str) -> Dict[str, Any]:
+def _generate_design_specification(blueprint: Dict[str, Any], theme: str,
+                                   blueprint_json: Optional[str] = None) -> Dict[str, Any]:
     """
     根据策略蓝图生成详细的设计规范
     确保与小红书生态完美适配
+    
+    blueprint_json为调用方已序列化好的蓝图JSON，提供时直接嵌入提示词，不再重复序列化。
     """
     logger.info("开始生成设计规范...")
     
@@ -382,7 +388,7 @@ def _generate_design_specification(blueprint: Dict[str, Any], theme: str) -> Dic
 根据以下策略蓝图，生成详细的设计规范，严格按照策略蓝图中规划的 {planned_image_count} 张图片执行。
 
 **策略蓝图内容**：
-{json.dumps(blueprint, ensure_ascii=False, indent=2)}
+{blueprint_json if blueprint_json is not None else json.dumps(blueprint, ensure_ascii=False, indent=2)}
 
 **主题**：{theme}
 
@@ -769,49 +775,58 @@ def _save_html_cache(html_content: str) -> bool:
         logger.error(f"保存HTML缓存失败: {e}")
         return False
 
+def _write_text_file(file_path: str, content: str) -> str:
+    """写入文本文件，返回文件路径（供线程池并发调用）"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return file_path
+
 # ===================================
 # 主入口函数
 # ===================================
 
-def execute_narrative_pipeline(blueprint: Dict[str, Any], theme: str, output_dir: str = "output") -> Dict[str, Any]:
+def execute_narrative_pipeline(blueprint: Dict[str, Any], theme: str, output_dir: str = OUTPUT_DIR) -> Dict[str, Any]:
     """
     执行叙事管道，生成小红书多图内容
     
     Args:
         blueprint (Dict[str, Any]): 策略蓝图
         theme (str): 内容主题
-        output_dir (str): 输出目录
+        output_dir (str): 输出目录，默认为配置中的OUTPUT_DIR
         
     Returns:
         Dict[str, Any]: 执行结果
     """
-    logger.info("=" * 80)
+    logger.info(_SEP_EQ)
     logger.info("🎬 启动小红书多图内容生成管道")
     logger.info(f"📝 主题: {theme}")
-    logger.info("=" * 80)
+    logger.info(_SEP_EQ)
     
     try:
         # 创建时间戳
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         
         # 创建主题专用输出目录
         theme_output_dir = os.path.join(output_dir, f"{theme}_{timestamp}")
-        os.makedirs(theme_output_dir, exist_ok=True)
+        ensure_dir(theme_output_dir)
+        out = Path(theme_output_dir)
         logger.info(f"创建主题文件夹：{theme_output_dir}")
         
+        # 策略蓝图只序列化一次，同时用于提示词和creative_blueprint.json
+        blueprint_json = json.dumps(blueprint, ensure_ascii=False, indent=2)
+        
         # 1. 叙事设计阶段：生成设计规范
         logger.info("第1阶段：叙事设计 - 生成小红书多图设计规范")
         try:
-            design_spec = _generate_design_specification(blueprint, theme)
+            design_spec = _generate_design_specification(blueprint, theme, blueprint_json)
         except Exception as e:
             logger.warning(f"AI生成设计规范失败，使用备用方案: {e}")
             design_spec = _get_fallback_design_spec(theme, len(design_spec.get("image_contents", [])))
             logger.info("已启用备用设计规范")
         
         # 保存设计规范到主题文件夹
-        design_spec_path = os.path.join(theme_output_dir, "design_spec.json")
-        with open(design_spec_path, 'w', encoding='utf-8') as f:
-            json.dump(design_spec, f, ensure_ascii=False, indent=2)
+        design_spec_path = str(out / "design_spec.json")
+        write_json_file(design_spec, design_spec_path)
         logger.info(f"设计规范已保存：{design_spec_path}")
         
         # 2. 视觉编码阶段：生成多个HTML页面
@@ -822,31 +837,31 @@ def execute_narrative_pipeline(blueprint: Dict[str, Any], theme: str, output_dir
             logger.warning(f"生成HTML页面失败，使用备用方案: {e}")
             html_pages = _generate_fallback_html_pages(design_spec, theme)
         
-        # 保存所有HTML页面到主题文件夹
-        html_files = []
-        for page_name, html_content in html_pages.items():
-            html_path = os.path.join(theme_output_dir, f"{page_name}.html")
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            html_files.append(html_path)
-            logger.info(f"HTML页面已保存：{html_path}")
+        # 保存所有HTML页面到主题文件夹（页面之间互不依赖，并发写入）
+        html_files = [
+            str(out / f"{page_name}.html")
+            for page_name in html_pages
+        ]
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(html_files)))) as executor:
+            for html_path in executor.map(_write_text_file, html_files, html_pages.values()):
+                logger.info(f"HTML页面已保存：{html_path}")
         
         # 3. 保存小红书内容文件
         logger.info("第3阶段：保存小红书发布内容")
         
         # 保存标题选项
         titles = design_spec.get("xiaohongshu_titles", [])
-        titles_path = os.path.join(theme_output_dir, "xiaohongshu_titles.txt")
-        with open(titles_path, 'w', encoding='utf-8') as f:
-            for i, title in enumerate(titles, 1):
-                f.write(f"{i}. {title}\n")
+        titles_path = out / "xiaohongshu_titles.txt"
+        titles_path.write_text(
+            "".join(f"{i}. {title}\n" for i, title in enumerate(titles, 1)),
+            encoding='utf-8'
+        )
         logger.info(f"标题选项已保存：{titles_path}")
         
         # 保存正文内容
         content = design_spec.get("xiaohongshu_content", "")
-        content_path = os.path.join(theme_output_dir, "xiaohongshu_content.txt")
-        with open(content_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        content_path = out / "xiaohongshu_content.txt"
+        content_path.write_text(content, encoding='utf-8')
         logger.info(f"正文内容已保存：{content_path}")
         
         # 4. 生成截图配置文件
@@ -856,25 +871,24 @@ def execute_narrative_pipeline(blueprint: Dict[str, Any], theme: str, output_dir
             "config": SCREENSHOT_CONFIG,
             "html_files": html_files,
             "output_directory": theme_output_dir,
-            "image_names": [f"image_{i+1}.png" for i in range(len(html_files))]
+            "image_names": [f"image_{i+1}.png" for i in range(len(html_files))],
+            "max_concurrency": min(len(html_files), 4)
         }
         
-        screenshot_config_path = os.path.join(theme_output_dir, "screenshot_config.json")
-        with open(screenshot_config_path, 'w', encoding='utf-8') as f:
-            json.dump(screenshot_config, f, ensure_ascii=False, indent=2)
+        screenshot_config_path = str(out / "screenshot_config.json")
+        write_json_file(screenshot_config, screenshot_config_path)
         logger.info(f"截图配置已保存：{screenshot_config_path}")
         
         # 5. 保存策略蓝图到主题文件夹（便于追溯）
-        blueprint_path = os.path.join(theme_output_dir, "creative_blueprint.json")
-        with open(blueprint_path, 'w', encoding='utf-8') as f:
-            json.dump(blueprint, f, ensure_ascii=False, indent=2)
+        blueprint_path = out / "creative_blueprint.json"
+        blueprint_path.write_text(blueprint_json, encoding='utf-8')
         logger.info(f"策略蓝图已保存：{blueprint_path}")
         
         # 6. 生成README文件
         readme_content = f"""# 小红书多图内容 - {theme}
 
 ## 生成时间
-{datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")}
+{time.strftime("%Y年%m月%d日 %H:%M:%S")}
 
 ## 内容概述
 - 主题：{theme}
@@ -906,9 +920,8 @@ def execute_narrative_pipeline(blueprint: Dict[str, Any], theme: str, output_dir
 - 配色方案：{design_spec.get('design_principles', {}).get('color_palette', [])}
 """
         
-        readme_path = os.path.join(theme_output_dir, "README.md")
-        with open(readme_path, 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+        readme_path = out / "README.md"
+        readme_path.write_text(readme_content, encoding='utf-8')
         logger.info(f"README文件已保存：{readme_path}")
         
         # 生成会话摘要
@@ -940,16 +953,15 @@ def execute_narrative_pipeline(blueprint: Dict[str, Any], theme: str, output_dir
         }
         
         # 保存会话摘要到主题文件夹
-        summary_path = os.path.join(theme_output_dir, "session_summary.json")
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(session_summary, f, ensure_ascii=False, indent=2)
+        summary_path = out / "session_summary.json"
+        write_json_file(session_summary, summary_path)
         logger.info(f"会话摘要已保存：{summary_path}")
         
-        logger.info("=" * 80)
+        logger.info(_SEP_EQ)
         logger.info("🎉 小红书多图内容生成管道执行完成")
         logger.info(f"📁 输出目录: {theme_output_dir}")
         logger.info(f"🖼️ 生成图片数量: {len(html_files)}")
-        logger.info("=" * 80)
+        logger.info(_SEP_EQ)
         
         # 返回执行结果
         return {
@@ -1099,13 +1111,11 @@ def initialize_execution_module() -> bool:
     
     # 检查必要的目录
     for directory in [CACHE_DIR, OUTPUT_DIR]:
-        if not os.path.exists(directory):
-            try:
-                os.makedirs(directory, exist_ok=True)
-                logger.info(f"创建目录: {directory}")
-            except Exception as e:
-                logger.error(f"创建目录失败: {directory} - {e}")
-                return False
+        try:
+            ensure_dir(directory)
+        except Exception as e:
+            logger.error(f"创建目录失败: {directory} - {e}")
+            return False
     
     logger.info("执行模块初始化完成")
     return True
@@ -17,13 +17,14 @@ import os
 import json
 import logging
 import asyncio
+import functools
 from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import time
 from datetime import datetime
 
 # 导入工具和配置
-from .utils import get_logger
+from .utils import get_logger, ensure_dir, write_json_file
 from config import SCREENSHOT_CONFIG, XIAOHONGSHU_IMAGE_WIDTH, XIAOHONGSHU_IMAGE_HEIGHT
 
 # ===================================
@@ -54,6 +55,9 @@ IMAGING_METHODS = {
     }
 }
 
+# 可发布的图片扩展名（小写）
+_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg"})
+
 # ===================================
 # 核心截图函数
 # ===================================
@@ -411,7 +415,7 @@ async def capture_single_html(html_file: str, output_file: str, config: Dict[str
     logger.info(f"开始单个HTML截图: {html_file}")
     
     # 确保输出目录存在
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    ensure_dir(os.path.dirname(output_file))
     
     # 记录开始时间
     start_time = time.time()
@@ -433,6 +437,12 @@ async def capture_single_html(html_file: str, output_file: str, config: Dict[str
             end_time = time.time()
             duration = end_time - start_time
             
+            # 单次stat获取文件大小，代替exists+getsize两次系统调用
+            try:
+                file_size = os.stat(output_file).st_size
+            except OSError:
+                file_size = 0
+            
             return {
                 "status": "success",
                 "method": method_name,
@@ -440,7 +450,7 @@ async def capture_single_html(html_file: str, output_file: str, config: Dict[str
                 "html_file": html_file,
                 "output_file": output_file,
                 "duration": duration,
-                "file_size": os.path.getsize(output_file) if os.path.exists(output_file) else 0
+                "file_size": file_size
             }
     
     # 如果所有方案都失败了
@@ -457,48 +467,59 @@ async def capture_single_html(html_file: str, output_file: str, config: Dict[str
         "error": "所有截图方案都失败了"
     }
 
-async def capture_multiple_html(html_files: List[str], output_dir: str, config: Dict[str, Any] = None) -> Dict[str, Any]:
+async def capture_multiple_html(html_files: List[str], output_dir: str, config: Dict[str, Any] = None,
+                                max_concurrency: Optional[int] = None) -> Dict[str, Any]:
     """
     批量截图多个HTML文件
     
+    各页面互不依赖，使用信号量限制并发数后同时截图。
+    
     Args:
         html_files (List[str]): HTML文件路径列表
         output_dir (str): 输出目录
         config (Dict[str, Any]): 截图配置
+        max_concurrency (Optional[int]): 最大并发截图数，默认为min(文件数, 4)
         
     Returns:
         Dict[str, Any]: 批量截图结果
     """
     logger.info(f"开始批量截图，共{len(html_files)}个文件")
     
+    if max_concurrency is None:
+        max_concurrency = min(len(html_files), 4)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
     # 确保输出目录存在
-    os.makedirs(output_dir, exist_ok=True)
+    ensure_dir(output_dir)
+    
+    # 预先生成所有输出文件路径
+    output_path = Path(output_dir)
+    output_files = [str(output_path / f"{Path(html_file).stem}.png") for html_file in html_files]
     
     # 记录开始时间
     start_time = time.time()
     
-    # 存储结果
-    results = []
-    successful_count = 0
+    async def capture_one(index: int, html_file: str, output_file: str) -> Dict[str, Any]:
+        async with semaphore:
+            logger.info(f"处理第{index}/{len(html_files)}个文件: {html_file}")
+            
+            # 执行截图
+            result = await capture_single_html(html_file, output_file, config)
+            
+            if result["status"] == "success":
+                logger.info(f"✓ 截图成功: {output_file}")
+            else:
+                logger.warning(f"✗ 截图失败: {html_file}")
+            
+            return result
     
-    # 逐个处理HTML文件
-    for i, html_file in enumerate(html_files, 1):
-        logger.info(f"处理第{i}/{len(html_files)}个文件: {html_file}")
-        
-        # 生成输出文件名
-        html_basename = os.path.basename(html_file)
-        html_name = os.path.splitext(html_basename)[0]
-        output_file = os.path.join(output_dir, f"{html_name}.png")
-        
-        # 执行截图
-        result = await capture_single_html(html_file, output_file, config)
-        results.append(result)
-        
-        if result["status"] == "success":
-            successful_count += 1
-            logger.info(f"✓ 截图成功: {output_file}")
-        else:
-            logger.warning(f"✗ 截图失败: {html_file}")
+    # 并发处理HTML文件，gather保持结果与输入顺序一致
+    results = await asyncio.gather(
+        *(capture_one(i, html_file, output_file)
+          for i, (html_file, output_file) in enumerate(zip(html_files, output_files), 1))
+    )
+    results = list(results)
+    successful_count = sum(1 for result in results if result["status"] == "success")
     
     # 计算总时间
     end_time = time.time()
@@ -540,14 +561,14 @@ def process_screenshot_config(config_file: str) -> Dict[str, Any]:
     
     try:
         # 加载配置文件
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config_data = json.load(f)
+        config_data = json.loads(Path(config_file).read_bytes())
         
         # 提取配置信息
         screenshot_config = config_data.get("config", SCREENSHOT_CONFIG)
         html_files = config_data.get("html_files", [])
         output_directory = config_data.get("output_directory", ".")
         image_names = config_data.get("image_names", [])
+        max_concurrency = config_data.get("max_concurrency")
         
         # 验证HTML文件存在
         valid_html_files = []
@@ -565,15 +586,14 @@ def process_screenshot_config(config_file: str) -> Dict[str, Any]:
         
         # 执行批量截图
         async def run_batch_capture():
-            return await capture_multiple_html(valid_html_files, images_dir, screenshot_config)
+            return await capture_multiple_html(valid_html_files, images_dir, screenshot_config, max_concurrency)
         
         # 运行异步任务
         result = asyncio.run(run_batch_capture())
         
         # 保存结果报告
         report_path = os.path.join(output_directory, "screenshot_report.json")
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        write_json_file(result, report_path)
         
         logger.info(f"截图报告已保存: {report_path}")
         
@@ -581,6 +601,7 @@ def process_screenshot_config(config_file: str) -> Dict[str, Any]:
             "status": "success",
             "config_file": config_file,
             "images_directory": images_dir,
+            "image_files": list_image_files(images_dir),
             "report_path": report_path,
             "summary": result
         }
@@ -597,6 +618,31 @@ def process_screenshot_config(config_file: str) -> Dict[str, Any]:
 # 工具函数
 # ===================================
 
+def list_image_files(images_dir: str) -> List[str]:
+    """
+    列出目录中的图片文件（按文件名排序）
+    
+    Args:
+        images_dir (str): 图片目录
+        
+    Returns:
+        List[str]: 图片文件路径列表，目录不存在时返回空列表
+    """
+    image_entries = []
+    
+    try:
+        with os.scandir(images_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                dot = name.rfind('.')
+                if dot != -1 and name[dot:].lower() in _IMAGE_EXTS and entry.is_file():
+                    image_entries.append((name, entry.path))
+    except FileNotFoundError:
+        return []
+    
+    image_entries.sort()
+    return [path for _, path in image_entries]
+
 def check_imaging_capabilities() -> Dict[str, Any]:
     """
     检查成像功能的可用性
@@ -662,6 +708,15 @@ def check_imaging_capabilities() -> Dict[str, Any]:
     
     return summary
 
+@functools.lru_cache(maxsize=1)
+def _cached_imaging_capabilities() -> Dict[str, Any]:
+    """缓存的成像功能检查结果，同一进程内只探测一次"""
+    return check_imaging_capabilities()
+
+def invalidate_imaging_capabilities():
+    """清除成像功能检查缓存（安装或卸载截图依赖后调用）"""
+    _cached_imaging_capabilities.cache_clear()
+
 # ===================================
 # 模块初始化
 # ===================================
@@ -677,7 +732,7 @@ def initialize_imaging_module() -> bool:
     
     try:
         # 检查成像功能
-        capabilities = check_imaging_capabilities()
+        capabilities = _cached_imaging_capabilities()
         
         if capabilities["available_methods"] == 0:
             logger.warning("没有可用的成像方案，仅支持备用方案")
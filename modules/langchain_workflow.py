@@ -11,7 +11,7 @@ RedCube AI 工作流系统 - 重构版
 """
 
 import asyncio
-from datetime import datetime
+import time
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
@@ -27,10 +27,30 @@ from modules.core.output import (
 )
 
 # 传统组件导入
-from modules.utils import get_logger
+from modules.utils import get_logger, write_json_file
 from modules.models import get_langchain_model
 from modules.git_automation import get_git_automation, commit_checkpoint
 
+# 引擎依赖关系：引擎名 -> (描述, 依赖的上游引擎)
+# 依赖即各V2引擎从输入中读取的上游结果键（如insight_distiller读取persona_core、
+# strategy_compass、truth_detector），不能随意删减，否则下游会拿到默认输入。
+# 串行模式按此表的顺序依次执行，并行模式按此表分层调度，同一层内互不依赖的引擎并发执行。
+# 注意：8个引擎全部启用时依赖构成一条链，每层只有一个引擎，并行模式与串行模式耗时相同；
+# 只有禁用部分上游引擎后（如禁用strategy_compass时persona_core与truth_detector同层）才会并发
+ENGINE_DEPENDENCIES = {
+    "persona_core": ("人格核心", ()),
+    "strategy_compass": ("策略罗盘", ("persona_core",)),
+    "truth_detector": ("真理探机", ("strategy_compass",)),
+    "insight_distiller": ("洞察提炼器", ("persona_core", "strategy_compass", "truth_detector")),
+    "narrative_prism": ("叙事棱镜", ("persona_core", "strategy_compass", "truth_detector", "insight_distiller")),
+    "atomic_designer": ("原子设计师", ("narrative_prism",)),
+    "visual_encoder": ("视觉编码器", ("narrative_prism", "atomic_designer")),
+    "hifi_imager": ("高保真成像仪", ("visual_encoder",))
+}
+
+# 第一认知象限（战略构想）包含的引擎
+STRATEGY_PHASE_ENGINES = ("persona_core", "strategy_compass", "truth_detector", "insight_distiller")
+
 class BaseWorkflowEngine:
     """重构后的工作流引擎基类"""
     
@@ -300,7 +320,7 @@ class RedCubeWorkflow:
         # 创建执行上下文
         context = {
             "topic": topic,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "force_regenerate": kwargs.get("force_regenerate", False),
             "enable_git": kwargs.get("enable_git", get_config_value("git.auto_commit", True)),
             "parallel_execution": kwargs.get("parallel_execution", get_config_value("workflow.parallel_engines", False))
@@ -354,16 +374,9 @@ class RedCubeWorkflow:
         # 第一认知象限：战略构想
         self.logger.info("🧠 第一认知象限：战略构想阶段")
         
-        # 按依赖顺序执行
-        execution_order = [
-            ("persona_core", "人格核心"),
-            ("strategy_compass", "策略罗盘"),
-            ("truth_detector", "真理探机"),
-            ("insight_distiller", "洞察提炼器")
-        ]
-        
-        for engine_name, engine_desc in execution_order:
-            if engine_name in self.engines:
+        # 按依赖表中的顺序执行
+        for engine_name, (engine_desc, _) in ENGINE_DEPENDENCIES.items():
+            if engine_name in self.engines and engine_name in STRATEGY_PHASE_ENGINES:
                 results[engine_name] = await self._execute_single_engine(
                     engine_name, engine_desc, context, results
                 )
@@ -375,43 +388,97 @@ class RedCubeWorkflow:
         # 第二认知象限：叙事表达
         self.logger.info("🎨 第二认知象限：叙事表达阶段")
         
-        execution_order = [
-            ("narrative_prism", "叙事棱镜"),
-            ("atomic_designer", "原子设计师"),
-            ("visual_encoder", "视觉编码器"),
-            ("hifi_imager", "高保真成像仪")
-        ]
-        
-        for engine_name, engine_desc in execution_order:
-            if engine_name in self.engines:
+        for engine_name, (engine_desc, _) in ENGINE_DEPENDENCIES.items():
+            if engine_name in self.engines and engine_name not in STRATEGY_PHASE_ENGINES:
                 results[engine_name] = await self._execute_single_engine(
                     engine_name, engine_desc, context, results
                 )
         
         return results
     
+    def _get_execution_waves(self) -> List[List[str]]:
+        """
+        按依赖关系将已启用的引擎分层
+        
+        未启用的上游引擎不参与依赖判断（与串行模式一致，下游使用默认输入）。
+        
+        Returns:
+            List[List[str]]: 执行层列表，同一层内的引擎互不依赖
+        """
+        pending = {
+            name: {dep for dep in deps if dep in self.engines}
+            for name, (_, deps) in ENGINE_DEPENDENCIES.items()
+            if name in self.engines
+        }
+        waves = []
+        while pending:
+            wave = [name for name, deps in pending.items() if not deps]
+            if not wave:
+                raise WorkflowException(
+                    f"引擎依赖关系存在循环: {sorted(pending)}",
+                    ErrorCode.WORKFLOW_EXECUTION_FAILED
+                )
+            waves.append(wave)
+            for name in wave:
+                del pending[name]
+            for deps in pending.values():
+                deps.difference_update(wave)
+        return waves
+    
     async def _execute_parallel_workflow(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """并行执行工作流（未来实现）"""
-        # 目前回退到串行执行
-        self.logger.info("并行执行模式尚未实现，回退到串行模式")
-        return await self._execute_sequential_workflow(context)
+        """
+        并行执行工作流
+        
+        按依赖分层调度，同一层的引擎通过asyncio.gather并发执行；
+        所有引擎共享一个信号量，限制同时进行的LLM调用数量以避免触发速率限制。
+        引擎全部启用时每层只有一个引擎，执行顺序和耗时与串行模式一致。
+        """
+        topic = context["topic"]
+        results = {}
+        semaphore = asyncio.Semaphore(get_config_value("workflow.max_concurrent", 4))
+        strategy_phase_committed = False
+        
+        waves = self._get_execution_waves()
+        self.logger.info(f"⚡ 并行模式: {len(self.engines)}个引擎分为{len(waves)}层执行")
+        
+        for wave in waves:
+            # 同一层的引擎看到的是本层开始前的结果快照
+            snapshot = dict(results)
+            wave_results = await asyncio.gather(*(
+                self._execute_single_engine(
+                    name, ENGINE_DEPENDENCIES[name][0], context, snapshot, semaphore
+                )
+                for name in wave
+            ))
+            results.update(zip(wave, wave_results))
+            
+            # 战略阶段检查点
+            if (context["enable_git"] and not strategy_phase_committed
+                    and all(name in results for name in STRATEGY_PHASE_ENGINES if name in self.engines)):
+                commit_checkpoint(f"完成战略构想阶段 - {topic}")
+                strategy_phase_committed = True
+        
+        return results
     
     async def _execute_single_engine(self, engine_name: str, engine_desc: str,
                                    context: Dict[str, Any], 
-                                   previous_results: Dict[str, Any]) -> Dict[str, Any]:
+                                   previous_results: Dict[str, Any],
+                                   semaphore: Optional[asyncio.Semaphore] = None) -> Dict[str, Any]:
         """执行单个引擎"""
-        self.logger.info(f"🔧 执行{engine_desc}引擎...")
-        
         engine = self.engines[engine_name]
         
         # 准备引擎输入
         engine_context = context.copy()
         engine_context.update(previous_results)
         
-        # 执行引擎
-        result = await engine.execute_with_recovery(engine_context)
+        # 执行引擎（并行模式下受共享信号量限制）
+        if semaphore is None:
+            self.logger.info(f"🔧 执行{engine_desc}引擎...")
+            return await engine.execute_with_recovery(engine_context)
         
-        return result
+        async with semaphore:
+            self.logger.info(f"🔧 执行{engine_desc}引擎...")
+            return await engine.execute_with_recovery(engine_context)
     
     def _build_final_result(self, topic: str, context: Dict[str, Any], 
                            results: Dict[str, Any]) -> Dict[str, Any]:
@@ -437,15 +504,13 @@ class RedCubeWorkflow:
     
     def _save_workflow_result(self, topic: str, result: Dict[str, Any]):
         """保存工作流结果"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
         output_dir = Path(get_config_value("paths.output_dir", "output"))
         workflow_dir = output_dir / f"redcube_{topic}_{timestamp}"
         workflow_dir.mkdir(parents=True, exist_ok=True)
         
         result_file = workflow_dir / "redcube_workflow_result.json"
-        import json
-        with open(result_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, ensure_ascii=False, indent=2)
+        write_json_file(result, result_file)
         
         self.logger.info(f"📁 工作流结果已保存: {result_file}")
 
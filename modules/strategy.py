@@ -51,7 +51,7 @@ except ImportError:
     )
 
 # 导入工具函数
-from .utils import load_json, save_json, get_logger, clean_filename
+from .utils import load_json, save_json, get_logger, clean_filename, ensure_dir, invalidate_dir_cache
 
 # 导入数据模型
 from .models import StrategyBlueprint
@@ -63,6 +63,9 @@ from .models import StrategyBlueprint
 # 获取模块专用的日志记录器
 logger = get_logger(__name__)
 
+# 日志分隔线
+_SEP_EQ = "=" * 60
+
 # ===================================
 # 辅助函数
 # ===================================
@@ -88,7 +91,7 @@ def _generate_cache_path(topic: str) -> str:
     
     # 创建主题专用的缓存目录
     topic_cache_dir = os.path.join(CACHE_DIR, f"strategy_{safe_topic}")
-    os.makedirs(topic_cache_dir, exist_ok=True)
+    ensure_dir(topic_cache_dir)
     
     # 返回蓝图文件的完整路径
     return os.path.join(topic_cache_dir, BLUEPRINT_FILENAME)
@@ -344,10 +347,10 @@ def run_strategy_and_planning(topic: str) -> Dict[str, Any]:
     # 1. 输入验证和日志记录
     # ===================================
     
-    logger.info("=" * 60)
+    logger.info(_SEP_EQ)
     logger.info("🚀 启动战略规划阶段")
     logger.info(f"📝 输入主题: {topic}")
-    logger.info("=" * 60)
+    logger.info(_SEP_EQ)
     
     # 验证输入
     if not topic or not isinstance(topic, str):
@@ -380,7 +383,7 @@ def run_strategy_and_planning(topic: str) -> Dict[str, Any]:
         if cached_data and isinstance(cached_data, dict):
             logger.info("✓ 缓存加载成功，跳过AI策略规划")
             logger.info("🎯 使用缓存的策略蓝图")
-            logger.info("=" * 60)
+            logger.info(_SEP_EQ)
             return cached_data
         else:
             logger.warning("⚠️ 缓存文件损坏，将重新生成")
@@ -438,7 +441,7 @@ def run_strategy_and_planning(topic: str) -> Dict[str, Any]:
         logger.info("🎉 战略规划阶段完成!")
         logger.info(f"📊 策略报告包含 {len(strategy_result.get('research_report', {}))} 个研究维度")
         logger.info(f"🎨 创作蓝图包含 {len(strategy_result.get('creative_blueprint', {}))} 个设计维度")
-        logger.info("=" * 60)
+        logger.info(_SEP_EQ)
         
         return strategy_result
         
@@ -485,14 +488,15 @@ def list_cached_strategies() -> list:
     if not os.path.exists(CACHE_DIR):
         return cached_topics
     
-    for item in os.listdir(CACHE_DIR):
-        item_path = os.path.join(CACHE_DIR, item)
-        if os.path.isdir(item_path) and item.startswith("strategy_"):
-            blueprint_file = os.path.join(item_path, BLUEPRINT_FILENAME)
-            if os.path.exists(blueprint_file):
-                # 从目录名提取主题（去掉前缀）
-                topic = item[9:]  # 移除 "strategy_" 前缀
-                cached_topics.append(topic)
+    # 使用scandir一次性读取目录项，is_dir()复用目录读取时的类型信息，避免逐项stat
+    with os.scandir(CACHE_DIR) as entries:
+        for entry in entries:
+            if entry.name.startswith("strategy_") and entry.is_dir():
+                blueprint_file = os.path.join(entry.path, BLUEPRINT_FILENAME)
+                if os.path.exists(blueprint_file):
+                    # 从目录名提取主题（去掉前缀）
+                    topic = entry.name[9:]  # 移除 "strategy_" 前缀
+                    cached_topics.append(topic)
     
     return cached_topics
 
@@ -515,18 +519,20 @@ def clear_strategy_cache(topic: Optional[str] = None) -> bool:
             if os.path.exists(cache_dir):
                 import shutil
                 shutil.rmtree(cache_dir)
+                invalidate_dir_cache(cache_dir)
                 logger.info(f"✓ 已清除主题 '{topic}' 的策略缓存")
             else:
                 logger.info(f"主题 '{topic}' 没有缓存文件")
         else:
             # 清除所有策略缓存
-            strategy_dirs = [d for d in os.listdir(CACHE_DIR) 
-                           if os.path.isdir(os.path.join(CACHE_DIR, d)) 
-                           and d.startswith("strategy_")]
+            with os.scandir(CACHE_DIR) as entries:
+                strategy_dirs = [entry.path for entry in entries
+                               if entry.name.startswith("strategy_") and entry.is_dir()]
             
             for strategy_dir in strategy_dirs:
                 import shutil
-                shutil.rmtree(os.path.join(CACHE_DIR, strategy_dir))
+                shutil.rmtree(strategy_dir)
+                invalidate_dir_cache(strategy_dir)
             
             logger.info(f"✓ 已清除所有策略缓存 ({len(strategy_dirs)} 个)")
         
@@ -569,9 +575,9 @@ def test_strategy_module():
 
 if __name__ == "__main__":
     # 当模块被直接运行时，执行测试
-    print("=" * 60)
+    print(_SEP_EQ)
     print("🧪 策略模块独立测试")
-    print("=" * 60)
+    print(_SEP_EQ)
     
     # 设置日志
     from .utils import setup_logging
@@ -586,4 +592,4 @@ if __name__ == "__main__":
         print("✗ 测试失败")
         exit(1)
     
-    print("=" * 60)
\ No newline at end of file
+    print(_SEP_EQ)
\ No newline at end of file
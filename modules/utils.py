@@ -15,10 +15,17 @@ import os
 import sys
 import json
 import logging
+import threading
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 from typing import Dict, Any, Optional, Union
 
+# orjson为可选依赖，未安装时回退到标准库json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # ===================================
 # 配置导入处理
 # ===================================
@@ -51,6 +58,46 @@ except ImportError:
 # 1. 目录管理功能
 # ===================================
 
+# 已确认存在的目录缓存，避免长时间运行时反复stat/makedirs
+_DIR_CACHE: set = set()
+_DIR_CACHE_LOCK = threading.Lock()
+
+def ensure_dir(dir_path: str) -> None:
+    """
+    确保目录存在，已创建过的目录直接跳过系统调用
+    
+    Args:
+        dir_path (str): 目录路径
+    
+    Raises:
+        OSError: 目录创建失败时抛出
+    """
+    path = os.fspath(dir_path)
+    if path in _DIR_CACHE:
+        return
+    
+    os.makedirs(path, exist_ok=True)
+    with _DIR_CACHE_LOCK:
+        _DIR_CACHE.add(path)
+
+def invalidate_dir_cache(dir_path: Optional[str] = None) -> None:
+    """
+    使目录缓存失效，删除目录后必须调用
+    
+    Args:
+        dir_path (Optional[str]): 被删除的目录路径，为None时清空全部缓存
+    """
+    with _DIR_CACHE_LOCK:
+        if dir_path is None:
+            _DIR_CACHE.clear()
+            return
+        
+        # 子目录随父目录一起被删除，需要一并移除
+        path = os.fspath(dir_path)
+        prefix = path.rstrip(os.sep) + os.sep
+        for cached in [p for p in _DIR_CACHE if p == path or p.startswith(prefix)]:
+            _DIR_CACHE.discard(cached)
+
 def ensure_directories() -> bool:
     """
     确保项目所需的所有目录都存在
@@ -75,7 +122,7 @@ def ensure_directories() -> bool:
     
     for dir_name, dir_path in directories:
         try:
-            os.makedirs(dir_path, exist_ok=True)
+            ensure_dir(dir_path)
             print(f"✓ {dir_name} 已准备就绪: {dir_path}")
         except OSError as e:
             print(f"✗ 创建{dir_name}失败: {dir_path} - {e}")
@@ -132,7 +179,7 @@ def setup_logging(verbose: bool = False) -> logging.Logger:
         logging.Logger: 配置完成的根日志记录器
     """
     # 确保日志目录存在
-    os.makedirs(LOGS_DIR, exist_ok=True)
+    ensure_dir(LOGS_DIR)
     
     # 设置日志级别
     log_level = logging.DEBUG if verbose else getattr(logging, LOG_CONFIG["level"])
@@ -232,7 +279,7 @@ def save_json(data: Union[Dict[str, Any], list], file_path: str) -> bool:
     """
     try:
         # 确保目标目录存在
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        ensure_dir(os.path.dirname(file_path))
         
         with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(
@@ -256,6 +303,27 @@ def save_json(data: Union[Dict[str, Any], list], file_path: str) -> bool:
         logger.error(f"数据序列化失败: {file_path} - {e}")
         return False
 
+def write_json_file(data: Union[Dict[str, Any], list], file_path: str, indent: int = 2) -> None:
+    """
+    将数据序列化为JSON并一次性写入文件
+    
+    安装了orjson时使用orjson序列化（仅支持2空格缩进），否则回退到标准库json。
+    与save_json不同，此函数不捕获异常，由调用方处理。
+    
+    Args:
+        data (Union[Dict[str, Any], list]): 要保存的数据
+        file_path (str): 保存文件的路径
+        indent (int): 缩进空格数，默认为2
+    """
+    if orjson is not None and indent == 2:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        with open(file_path, 'wb') as f:
+            f.write(payload)
+        return
+    
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+
 def load_json(file_path: str) -> Optional[Union[Dict[str, Any], list]]:
     """
     从JSON文件加载数据
@@ -282,8 +350,9 @@ def load_json(file_path: str) -> Optional[Union[Dict[str, Any], list]]:
             logger.warning(f"JSON文件不存在: {file_path}")
             return None
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # 整个文件一次读入后解析，省去文本流的缓冲和解码开销
+        raw = Path(file_path).read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
         
         logger.info(f"JSON文件加载成功: {file_path}")
         return data
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+测试原子设计师引擎V2的JSON处理
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+
+import pytest
+
+# 添加模块路径
+sys.path.append(str(Path(__file__).parent))
+
+# 测试模式下跳过API密钥检查
+os.environ.setdefault("REDCUBE_TEST_MODE", "1")
+
+from modules.engines.atomic_designer_v2 import AtomicDesignerEngineV2
+
+
+def test_dump_design_matches_json_layout():
+    """orjson输出与标准库json的2空格缩进格式一致"""
+    design = {"atomic_design": {"atoms": [{"type": "title", "content": "主标题"}]}, "note": None}
+    assert AtomicDesignerEngineV2._dump_design(design) == json.dumps(design, ensure_ascii=False, indent=2)
+
+
+def test_dump_design_handles_big_integers():
+    """超过64位的整数回退到标准库json，数值保持不变"""
+    design = {"id": 2 ** 70}
+    assert json.loads(AtomicDesignerEngineV2._dump_design(design)) == design
+
+
+def test_dump_design_writes_valid_json_for_nan():
+    """NaN写成null，输出仍是合法JSON"""
+    dumped = AtomicDesignerEngineV2._dump_design({"score": float("nan")})
+    assert json.loads(dumped) == {"score": None}
+
+
+@pytest.fixture
+def engine():
+    """只测试解析逻辑，不初始化处理链（无需模型和配置目录）"""
+    return AtomicDesignerEngineV2.__new__(AtomicDesignerEngineV2)
+
+
+def test_parse_extracts_first_object_after_prose(engine):
+    """说明文字中的第一个JSON对象被完整解析，之后的文字被忽略"""
+    content = '设计如下：{"atomic_design": {"atoms": [{"content": "含有}括号的\\"文本\\""}]}} 以上为设计说明 {"extra": 1}'
+    assert engine._parse_and_validate_json(content) == {
+        "atomic_design": {"atoms": [{"content": '含有}括号的"文本"'}]}
+    }
+
+
+def test_parse_prefers_json_fence(engine):
+    """```json代码块优先于正文中的其他对象"""
+    content = '说明\n```json\n{"design_system": {"colors": ["#fff"]}}\n```\n其他'
+    assert engine._parse_and_validate_json(content) == {"design_system": {"colors": ["#fff"]}}
+
+
+def test_parse_falls_back_to_default_structure(engine):
+    """无法解析的内容返回默认设计结构"""
+    result = engine._parse_and_validate_json("没有JSON，只有一个{不完整的对象")
+    assert "atomic_design" in result
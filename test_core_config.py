@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+测试统一配置管理
+"""
+
+import sys
+import pickle
+from pathlib import Path
+
+import pytest
+
+# 添加模块路径
+sys.path.append(str(Path(__file__).parent))
+
+from modules.core.config import SystemConfig, ConfigSource
+import modules.core.config as config_module
+
+
+@pytest.fixture(autouse=True)
+def isolated_dir(tmp_path, monkeypatch):
+    """在临时目录中运行，测试模式下跳过API密钥检查"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("REDCUBE_TEST_MODE", "1")
+    return tmp_path
+
+
+def test_explicit_config_file_is_used_as_is(isolated_dir):
+    """显式指定的YAML配置即使不存在也不会被替换为JSON"""
+    (isolated_dir / "config.json").write_text('{"ai": {"model_name": "from-json"}}', encoding="utf-8")
+
+    config = SystemConfig("custom.yaml")
+    assert config.config_file == "custom.yaml"
+    assert config.get("ai.model_name") != "from-json"
+
+
+def test_default_prefers_json_sibling(isolated_dir):
+    """未指定配置文件时，config.json优先于config.yaml"""
+    (isolated_dir / "config.yaml").write_text("ai:\n  model_name: from-yaml\n", encoding="utf-8")
+    (isolated_dir / "config.json").write_text('{"ai": {"model_name": "from-json"}}', encoding="utf-8")
+
+    config = SystemConfig()
+    assert config.config_file == "config.json"
+    assert config.get("ai.model_name") == "from-json"
+
+
+def test_default_reads_existing_yaml(isolated_dir):
+    """未指定配置文件且只有config.yaml时读取YAML"""
+    (isolated_dir / "config.yaml").write_text("ai:\n  model_name: from-yaml\n", encoding="utf-8")
+
+    config = SystemConfig()
+    assert config.config_file == "config.yaml"
+    assert config.get("ai.model_name") == "from-yaml"
+
+
+def test_env_values_coerced_to_default_types(monkeypatch):
+    """环境变量按配置项当前值的类型转换"""
+    monkeypatch.setenv("REDCUBE_SYSTEM_DEBUG", "yes")
+    monkeypatch.setenv("REDCUBE_AI_MAX_TOKENS", "4096")
+    monkeypatch.setenv("REDCUBE_AI_TEMPERATURE", "0.2")
+    monkeypatch.setenv("REDCUBE_AI_MODEL_NAME", "custom-model")
+
+    config = SystemConfig()
+    assert config.get("system.debug") is True
+    assert config.get("ai.max_tokens") == 4096
+    assert config.get("ai.temperature") == 0.2
+    assert config.get("ai.model_name") == "custom-model"
+    assert config.config_sources["ai.max_tokens"] == ConfigSource.ENV
+
+
+def test_env_list_value_split_on_commas(isolated_dir, monkeypatch):
+    """配置文件中的列表项可被逗号分隔的环境变量覆盖"""
+    (isolated_dir / "config.yaml").write_text("output:\n  tags: [a, b]\n", encoding="utf-8")
+    monkeypatch.setenv("REDCUBE_OUTPUT_TAGS", "x,y,z")
+
+    assert SystemConfig().get("output.tags") == ["x", "y", "z"]
+
+
+def test_invalid_env_value_keeps_previous_value(monkeypatch, capsys):
+    """类型转换失败时保留原值并给出警告"""
+    monkeypatch.setenv("REDCUBE_AI_MAX_TOKENS", "many")
+
+    config = SystemConfig()
+    assert config.get("ai.max_tokens") == 2048
+    assert config.config_sources["ai.max_tokens"] == ConfigSource.DEFAULT
+    assert "REDCUBE_AI_MAX_TOKENS" in capsys.readouterr().out
+
+
+def test_flat_cache_reused_until_file_changes(isolated_dir, monkeypatch):
+    """配置文件未变化时读取marshal缓存，文件变化后重新解析"""
+    config_path = isolated_dir / "config.yaml"
+    config_path.write_text("ai:\n  model_name: first\n", encoding="utf-8")
+    assert SystemConfig("config.yaml").get("ai.model_name") == "first"
+    assert (isolated_dir / "config.yaml.cache.marshal").exists()
+
+    class FailingYaml:
+        @staticmethod
+        def load(*args, **kwargs):
+            raise AssertionError("配置文件未变化时不应重新解析")
+
+    with monkeypatch.context() as m:
+        m.setattr(config_module, "yaml", FailingYaml)
+        assert SystemConfig("config.yaml").get("ai.model_name") == "first"
+
+    config_path.write_text("ai:\n  model_name: second-version\n", encoding="utf-8")
+    assert SystemConfig("config.yaml").get("ai.model_name") == "second-version"
+
+
+def test_unreadable_flat_cache_falls_back_to_parsing(isolated_dir):
+    """缓存损坏或为pickle数据时忽略缓存，重新解析配置文件"""
+    (isolated_dir / "config.yaml").write_text("ai:\n  model_name: from-yaml\n", encoding="utf-8")
+    cache_path = isolated_dir / "config.yaml.cache.marshal"
+
+    cache_path.write_bytes(pickle.dumps({"ai.model_name": "from-pickle"}))
+    assert SystemConfig("config.yaml").get("ai.model_name") == "from-yaml"
+
+    cache_path.write_bytes(b"\x00broken")
+    assert SystemConfig("config.yaml").get("ai.model_name") == "from-yaml"
+
+
+def test_unsupported_values_skip_flat_cache(isolated_dir):
+    """含marshal不支持的类型（如日期）时不写缓存，配置照常加载"""
+    (isolated_dir / "config.yaml").write_text("system:\n  released: 2024-01-01\n", encoding="utf-8")
+
+    config = SystemConfig("config.yaml")
+    assert str(config.get("system.released")) == "2024-01-01"
+    assert not (isolated_dir / "config.yaml.cache.marshal").exists()
+    assert list(isolated_dir.glob("*.tmp")) == []
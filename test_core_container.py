@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+测试依赖注入容器
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加模块路径
+sys.path.append(str(Path(__file__).parent))
+
+from modules.core.container import DependencyContainer
+
+
+class ServiceA:
+    pass
+
+
+class ServiceB:
+    def __init__(self, a: ServiceA):
+        self.a = a
+
+
+def _make_container() -> DependencyContainer:
+    container = DependencyContainer()
+    container.register_singleton(ServiceA).register_transient(ServiceB, dependencies=["ServiceA"])
+    return container
+
+
+def test_service_info_returns_fresh_dicts():
+    """修改get_service_info的返回值不影响后续调用"""
+    container = _make_container()
+
+    info = container.get_service_info()
+    info["total_services"] = 99
+    info["dependency_graph"]["ServiceB"].append("Other")
+    info["services"]["ServiceB"]["dependencies"].append("Other")
+
+    fresh = container.get_service_info()
+    assert fresh["total_services"] == 2
+    assert fresh["dependency_graph"]["ServiceB"] == ["ServiceA"]
+    assert fresh["services"]["ServiceB"]["dependencies"] == ["ServiceA"]
+    # 服务描述符中的依赖列表也不受影响
+    assert container.services["ServiceB"].dependencies == ["ServiceA"]
+
+
+def test_container_info_returns_fresh_dicts():
+    """get_container_info与get_service_info不共享依赖图"""
+    container = _make_container()
+
+    container_info = container.get_container_info()
+    container_info["dependency_graph"]["ServiceA"].append("Other")
+    container_info["registered_services"].append("Other")
+
+    assert container.get_service_info()["dependency_graph"]["ServiceA"] == []
+    assert container.get_container_info()["registered_services"] == ["ServiceA", "ServiceB"]
+
+
+def test_info_reflects_new_instances():
+    """实例创建后诊断信息随之更新"""
+    container = _make_container()
+    assert container.get_service_info()["services"]["ServiceA"]["has_instance"] is False
+
+    container.resolve(ServiceB)
+    assert container.get_service_info()["services"]["ServiceA"]["has_instance"] is True
+
+
+def test_constructor_resolving_another_service():
+    """构造函数内部通过容器解析其他服务时正常创建"""
+    container = DependencyContainer()
+
+    class Inner:
+        pass
+
+    class Outer:
+        def __init__(self):
+            self.inner = container.resolve(Inner)
+
+    container.register_singleton(Inner).register_transient(Outer)
+    assert container.resolve(Outer).inner is container.resolve(Inner)
+    assert container.creation_stack == []
+
+
+def test_constructor_calling_back_into_itself_is_a_cycle():
+    """没有声明依赖、但构造函数回调容器解析自身的服务按循环依赖报错，而不是无限递归"""
+    container = DependencyContainer()
+
+    class SelfResolving:
+        def __init__(self):
+            self.other = container.resolve(SelfResolving)
+
+    container.register_transient(SelfResolving)
+    with pytest.raises(RuntimeError, match="循环依赖"):
+        container.resolve(SelfResolving)
+    assert container.creation_stack == []
+
+
+def test_leaf_fast_path_only_for_trivial_constructors():
+    """只有预设实例和未自定义构造函数的类走叶子快速路径"""
+    container = DependencyContainer()
+
+    class Plain:
+        pass
+
+    class WithInit:
+        def __init__(self):
+            pass
+
+    container.register_singleton(Plain).register_singleton(WithInit)
+    container.register_singleton(int, instance=1)
+    container.register_singleton(str, factory=lambda: "x")
+
+    assert container.services["Plain"].is_leaf
+    assert container.services["int"].is_leaf
+    assert not container.services["WithInit"].is_leaf
+    assert not container.services["str"].is_leaf
+
+
+class ServiceC:
+    pass
+
+
+def test_registration_detects_cycle_through_existing_services():
+    """新注册的服务闭合已有依赖链时报循环依赖"""
+    container = DependencyContainer()
+    container.register_transient(ServiceA, dependencies=["ServiceB"])
+    container.register_transient(ServiceB, dependencies=["ServiceC"])
+
+    with pytest.raises(RuntimeError, match="循环依赖"):
+        container.register_transient(ServiceC, dependencies=["ServiceA"])
+
+
+def test_reregistering_verified_service_rechecks_cycles():
+    """已验证无环的服务重新注册新依赖后仍能发现循环"""
+    container = DependencyContainer()
+    container.register_transient(ServiceB)
+    container.register_transient(ServiceA, dependencies=["ServiceB"])
+
+    with pytest.raises(RuntimeError, match="循环依赖"):
+        container.register_transient(ServiceB, dependencies=["ServiceA"])
+
+
+def test_shared_dependency_is_not_a_cycle_but_self_dependency_is():
+    """菱形依赖正常注册，依赖自身的服务报循环依赖"""
+    container = DependencyContainer()
+    container.register_transient(ServiceC)
+    container.register_transient(ServiceB, dependencies=["ServiceC"])
+    container.register_transient(ServiceA, dependencies=["ServiceB", "ServiceC"])
+
+    with pytest.raises(RuntimeError, match="循环依赖"):
+        container.register_transient(ServiceC, dependencies=["ServiceC"])
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+测试统一异常处理
+"""
+
+import sys
+from pathlib import Path
+
+# 添加模块路径
+sys.path.append(str(Path(__file__).parent))
+
+from modules.core.exceptions import ExceptionHandler, WorkflowException
+
+
+def test_to_dict_returns_independent_copies():
+    """修改to_dict的返回值不影响之后的调用"""
+    exception = WorkflowException("执行失败")
+
+    first = exception.to_dict()
+    first["message"] = "被修改"
+
+    assert exception.to_dict()["message"] == "执行失败"
+    assert exception.to_dict() is not exception.to_dict()
+
+
+def test_handler_results_do_not_share_logged_entries():
+    """处理结果中的错误字典与错误日志互不影响"""
+    handler = ExceptionHandler()
+    exception = WorkflowException("执行失败")
+
+    result = handler.handle_exception(exception)
+    result["error"]["message"] = "被修改"
+    handler.handle_exception(exception)
+
+    first_log, second_log = handler.error_logs
+    assert first_log is not second_log
+    assert first_log["message"] == "执行失败"
+    assert second_log["message"] == "执行失败"
+    assert handler.get_error_statistics()["total_errors"] == 2
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+测试统一输出格式
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加模块路径
+sys.path.append(str(Path(__file__).parent))
+
+from modules.core.output import UnifiedOutput, OutputFormat, ContentType
+
+
+@pytest.mark.parametrize("content", [
+    "# 宝宝辅食指南\n正文",
+    "### 第三步",
+    "正文\n- 第一条\n- 第二条",
+    "  * 缩进的列表项",
+    "1. 准备食材\n2. 蒸熟压泥",
+    "这一点**非常重要**",
+    "使用 `print` 输出",
+    "```python\nprint(1)\n```",
+])
+def test_markdown_detected(content):
+    """行首的标题、列表标记以及加粗、代码标记识别为Markdown"""
+    output = UnifiedOutput("test_engine", "测试主题").set_content(content)
+    assert output.format == OutputFormat.MARKDOWN
+
+
+@pytest.mark.parametrize("content", [
+    "今天分享宝宝辅食 #育儿 #辅食添加",
+    "拍摄于2024-01-01，地点：家里",
+    "体重增长了1.5公斤，身高72.3厘米",
+    "well-known的做法：少盐少糖",
+    "5*3=15，记得按比例调配",
+    "C#是一门编程语言",
+])
+def test_plain_text_not_detected_as_markdown(content):
+    """正文中的话题标签、连字符、小数和星号不再误判为Markdown"""
+    output = UnifiedOutput("test_engine", "测试主题").set_content(content)
+    assert output.format == OutputFormat.TEXT
+
+
+def test_structured_text_markers_anchored():
+    """结构化文本标记只在行首匹配"""
+    output = UnifiedOutput("test_engine", "测试主题")
+    assert output._is_structured_text("## 小结\n内容")
+    assert output._is_structured_text("步骤：\n1. 洗净")
+    assert not output._is_structured_text("时间为2024-01-01，版本1. 2")
+
+
+def test_attribute_assignment_invalidates_to_dict():
+    """直接给属性赋值后to_dict反映新值"""
+    output = UnifiedOutput("test_engine", "测试主题").set_content("第一版", OutputFormat.TEXT)
+    assert output.to_dict()["content"] == "第一版"
+
+    output.content = "第二版"
+    assert output.to_dict()["content"] == "第二版"
+
+    output.format = OutputFormat.HYBRID
+    output.structured_data = {"score": 1}
+    result = output.to_dict()
+    assert result["format"] == "hybrid"
+    assert result["structured_data"] == {"score": 1}
+
+    output.content_type = ContentType.ANALYSIS
+    output.metadata = {"source": "test"}
+    result = output.to_dict()
+    assert result["content_type"] == ContentType.ANALYSIS.value
+    assert result["metadata"] == {"source": "test"}
+
+
+def test_to_dict_returns_copies():
+    """修改to_dict的返回值不影响后续调用"""
+    output = UnifiedOutput("test_engine", "测试主题").set_content("正文", OutputFormat.TEXT)
+
+    output.to_dict()["content"] = "被修改"
+    assert output.to_dict()["content"] == "正文"
+
+
+def test_summary_tracks_content_changes():
+    """内容替换后摘要中的长度同步更新"""
+    output = UnifiedOutput("test_engine", "测试主题").set_content("短", OutputFormat.TEXT)
+    assert output.get_summary()["content_length"] == 1
+
+    output.content = "更长的内容"
+    assert output.get_summary()["content_length"] == 5
+    assert output.get_summary()["format"] == "text"
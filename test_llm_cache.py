@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+测试LLM调用结果缓存
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# 添加模块路径
+sys.path.append(str(Path(__file__).parent))
+
+from modules.core import llm_cache
+from modules.core.llm_cache import AsyncLRUCache, make_cache_key
+
+
+def test_cache_key_ignores_argument_order():
+    """相同参数得到相同的键，参数不同时键不同"""
+    key = make_cache_key(model="m", temperature=0.7, inputs={"a": 1, "b": 2})
+    assert key == make_cache_key(inputs={"b": 2, "a": 1}, temperature=0.7, model="m")
+    assert key != make_cache_key(model="m", temperature=0.8, inputs={"a": 1, "b": 2})
+
+
+def test_expired_entries_are_misses(monkeypatch):
+    """超过TTL的条目视为未命中并从内存中移除"""
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = AsyncLRUCache()
+
+    async def scenario():
+        await cache.set("key", {"value": 1}, ttl=10)
+        assert await cache.get("key") == {"value": 1}
+        now[0] += 11
+        assert await cache.get("key") is None
+
+    asyncio.run(scenario())
+    assert cache.get_stats()["entries"] == 0
+    assert cache.stats == {"hits": 1, "misses": 1, "disk_hits": 0}
+
+
+def test_least_recently_used_entry_evicted():
+    """超过上限时淘汰最久未使用的条目，读取会刷新使用顺序"""
+    cache = AsyncLRUCache(max_entries=2)
+
+    async def scenario():
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1
+        await cache.set("c", 3)
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [1, None, 3]
+
+
+def test_cached_values_are_copies():
+    """修改写入的值或读取结果都不影响缓存内容"""
+    cache = AsyncLRUCache()
+    value = {"atoms": ["title"]}
+
+    async def scenario():
+        await cache.set("key", value)
+        value["atoms"].append("changed")
+        (await cache.get("key"))["atoms"].append("changed")
+        return await cache.get("key")
+
+    assert asyncio.run(scenario()) == {"atoms": ["title"]}
+
+
+def test_disk_round_trip(tmp_path):
+    """写入的记录在新实例中从磁盘读取，并回填内存缓存"""
+    disk_dir = str(tmp_path / "llm")
+    design = {"atomic_design": {"atoms": [{"content": "主标题"}]}}
+
+    async def write():
+        cache = AsyncLRUCache(disk_dir=disk_dir)
+        await cache.set("key", design)
+        await cache.flush()
+
+    async def read():
+        cache = AsyncLRUCache(disk_dir=disk_dir)
+        results = [await cache.get("key"), await cache.get("key")]
+        return cache, results
+
+    asyncio.run(write())
+    cache, results = asyncio.run(read())
+    assert results == [design, design]
+    assert cache.stats == {"hits": 2, "misses": 0, "disk_hits": 1}
+    assert [p.name for p in (tmp_path / "llm").iterdir()] == ["key.json"]
+
+
+def test_expired_disk_records_are_misses(tmp_path, monkeypatch):
+    """磁盘上已过期的记录视为未命中"""
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    disk_dir = str(tmp_path / "llm")
+
+    async def scenario():
+        cache = AsyncLRUCache(disk_dir=disk_dir)
+        await cache.set("key", "value", ttl=10)
+        await cache.flush()
+        now[0] += 11
+        return await AsyncLRUCache(disk_dir=disk_dir).get("key")
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_unserializable_values_stay_in_memory(tmp_path):
+    """无法序列化的值只保留在内存中，不写磁盘"""
+    cache = AsyncLRUCache(disk_dir=str(tmp_path / "llm"))
+    value = {"items": {1, 2}}
+
+    async def scenario():
+        await cache.set("key", value)
+        await cache.flush()
+        return await cache.get("key")
+
+    assert asyncio.run(scenario()) == value
+    assert list((tmp_path / "llm").iterdir()) == []
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+测试工作流引擎的依赖分层调度
+"""
+
+import os
+import sys
+import asyncio
+from pathlib import Path
+
+# 添加模块路径
+sys.path.append(str(Path(__file__).parent))
+
+# 测试模式下跳过API密钥检查
+os.environ.setdefault("REDCUBE_TEST_MODE", "1")
+
+from modules.utils import get_logger
+from modules.langchain_workflow import ENGINE_DEPENDENCIES, RedCubeWorkflow
+
+
+class FakeEngine:
+    """记录收到的上游结果键"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.seen_keys = None
+
+    async def execute_with_recovery(self, inputs):
+        self.seen_keys = {key for key in inputs if key in ENGINE_DEPENDENCIES}
+        return {"content": self.name}
+
+
+def _make_workflow(engine_names) -> RedCubeWorkflow:
+    """只测试调度逻辑，不初始化模型和引擎"""
+    workflow = RedCubeWorkflow.__new__(RedCubeWorkflow)
+    workflow.logger = get_logger("RedCubeWorkflow")
+    workflow.engines = {name: FakeEngine(name) for name in engine_names}
+    return workflow
+
+
+def test_all_engines_form_a_chain():
+    """8个引擎全部启用时每层只有一个引擎，顺序与依赖表一致"""
+    workflow = _make_workflow(ENGINE_DEPENDENCIES)
+    assert workflow._get_execution_waves() == [[name] for name in ENGINE_DEPENDENCIES]
+
+
+def test_disabled_upstream_engines_share_a_wave():
+    """禁用strategy_compass后，persona_core与truth_detector同层执行"""
+    enabled = [name for name in ENGINE_DEPENDENCIES if name != "strategy_compass"]
+    workflow = _make_workflow(enabled)
+
+    waves = workflow._get_execution_waves()
+    assert waves[0] == ["persona_core", "truth_detector"]
+    assert waves[1:] == [["insight_distiller"], ["narrative_prism"], ["atomic_designer"],
+                         ["visual_encoder"], ["hifi_imager"]]
+
+
+def test_parallel_engines_receive_upstream_results():
+    """并行模式下每个引擎都能拿到其依赖的上游结果"""
+    workflow = _make_workflow(ENGINE_DEPENDENCIES)
+    context = {"topic": "测试主题", "enable_git": False}
+
+    results = asyncio.run(workflow._execute_parallel_workflow(context))
+
+    assert list(results) == list(ENGINE_DEPENDENCIES)
+    for name, (_, deps) in ENGINE_DEPENDENCIES.items():
+        assert set(deps) <= workflow.engines[name].seen_keys